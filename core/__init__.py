@@ -1,12 +1,26 @@
+import importlib
+
 # 基础模块
 from .models import Channel
-from .fetcher import SourceFetcher
 from .parser import PlaylistParser
 from .matcher import AutoCategoryMatcher
-from .tester import SpeedTester
 from .exporter import ResultExporter
 from .progress import SmartProgress
 
+# 依赖aiohttp的模块按需导入（首次访问属性时加载），解析子进程与启动阶段不必加载网络栈
+_LAZY_EXPORTS = {
+    'SourceFetcher': '.fetcher',
+    'SpeedTester': '.tester',
+}
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 # 显式声明导出的公共API
 __all__ = [
     'Channel',
@@ -1,17 +1,58 @@
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import List, Callable, Set, Dict, Tuple, Optional
-from .models import Channel
+from typing import List, Callable, Set, Dict, Tuple, Optional, NamedTuple
+from .models import Channel, UNCATEGORIZED, STATUS_ONLINE
 import csv
 from urllib.parse import quote
 import re
 from collections import defaultdict
 import gzip
-import shutil
+import io
+import os
+from contextlib import contextmanager
+from operator import attrgetter, itemgetter
 
 logger = logging.getLogger(__name__)
 
+# 导出文件写缓冲大小（1MiB，减少大文件的小块系统调用）
+WRITE_BUFFER_SIZE = 1 << 20
+
+# quote()不会改写的字符（字母数字、"_.-~"及默认安全字符"/"）
+QUOTE_SAFE_PATTERN = re.compile(r'[A-Za-z0-9_.~/-]+')
+
+def _quote(text: str) -> str:
+    """URL编码（纯安全字符直接返回，跳过quote的逐字符处理）"""
+    return text if QUOTE_SAFE_PATTERN.fullmatch(text) else quote(text)
+
+@contextmanager
+def _open_atomic(path: Path, mode: str = 'w', **kwargs):
+    """
+    原子写入文件：先写同目录下的.tmp文件，成功后再os.replace覆盖目标
+    （避免中途失败或并发读取时看到不完整的输出文件）
+    """
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        with open(tmp_path, mode, buffering=WRITE_BUFFER_SIZE, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+# 历史记录CSV的列投影（与表头顺序一致）
+HISTORY_ROW = attrgetter(
+    'name', 'url', 'category', 'original_category',
+    'status', 'download_speed', 'response_time'
+)
+
+class ExportPartition(NamedTuple):
+    """单次遍历得到的导出分组结果"""
+    uncategorized: Dict[str, List[Tuple[str, str, str]]]  # {原始分组: [(排序键, 标准名, URL)]}
+    online: List[Channel]                            # 已分类、在线且URL去重
+    ipv4: List[Channel]
+    ipv6: List[Channel]
+
 class ResultExporter:
     """增强版结果导出器（强制隔离未分类频道）"""
 
@@ -58,19 +99,13 @@ class ResultExporter:
             progress_cb: 进度回调函数
         """
         try:
-            # 按原始分组收集未分类频道
-            uncategorized = defaultdict(list)
-            for channel in channels:
-                if channel.category == "未分类":
-                    clean_name = self.matcher.normalize_channel_name(channel.name)
-                    uncategorized[channel.original_category].append((clean_name, channel.url))
-
-            # 导出主文件（自动跳过未分类）
-            valid_channels = [c for c in channels if c.category != "未分类"]
-            self._export_all(valid_channels)
+            # 单次遍历完成未分类收集、在线过滤、URL去重与协议分类
+            uncategorized, online, ipv4, ipv6 = self._partition(channels)
+            
+            # 导出主文件
+            self._export_all(online)
             
             # 导出协议分类文件
-            ipv4, ipv6 = self._classify_channels(valid_channels)
             self._export_channels(ipv4, "ipv4")
             self._export_channels(ipv6, "ipv6")
             
@@ -87,19 +122,21 @@ class ResultExporter:
             logger.error(f"导出过程中发生错误: {str(e)}", exc_info=True)
             raise
 
-    def _export_uncategorized(self, uncategorized: Dict[str, List[Tuple[str, str]]]) -> None:
-        """专用未分类频道导出"""
+    def _export_uncategorized(self, uncategorized: Dict[str, List[Tuple[str, str, str]]]) -> None:
+        """专用未分类频道导出（条目自带预计算的小写排序键）"""
         try:
-            with open(self.uncategorized_path, 'w', encoding='utf-8') as f:
-                for original_category in sorted(uncategorized.keys()):
-                    channels = uncategorized[original_category]
-                    if not channels:
-                        continue
-                        
-                    f.write(f"{original_category},#genre#\n")
-                    for name, url in sorted(channels, key=lambda x: x[0].lower()):
-                        f.write(f"{name},{url}\n")
-                    f.write("\n")
+            parts = []
+            sort_key = itemgetter(0)
+            for original_category, channels in sorted(uncategorized.items()):
+                if not channels:
+                    continue
+                    
+                parts.append(f"{original_category},#genre#\n")
+                parts.extend(f"{name},{url}\n" for _, name, url in sorted(channels, key=sort_key))
+                parts.append("\n")
+            
+            with _open_atomic(self.uncategorized_path, encoding='utf-8', newline='\n') as f:
+                f.write("".join(parts))
             
             logger.info(
                 f"未分类频道已保存 | 文件: {self.uncategorized_path} | "
@@ -109,11 +146,38 @@ class ResultExporter:
         except Exception as e:
             logger.error(f"未分类频道导出失败: {str(e)}", exc_info=True)
 
-    def _classify_channels(self, channels: List[Channel]) -> Tuple[List[Channel], List[Channel]]:
-        """分类频道为IPv4/IPv6（已跳过未分类频道）"""
-        ipv4_channels = [c for c in channels if c.status == 'online' and Channel.classify_ip_type(c.url) != "ipv6"]
-        ipv6_channels = [c for c in channels if c.status == 'online' and Channel.classify_ip_type(c.url) == "ipv6"]
-        return ipv4_channels, ipv6_channels
+    def _partition(self, channels: List[Channel]) -> ExportPartition:
+        """
+        单次遍历划分待导出频道（未分类频道单独收集，不进入主文件）
+        返回: ExportPartition(未分类分组, 在线去重频道, IPv4频道, IPv6频道)
+        """
+        uncategorized = defaultdict(list)
+        seen_urls = set()
+        online, ipv4_channels, ipv6_channels = [], [], []
+        
+        # 热循环内的方法查找预先绑定为局部变量
+        normalize = self.matcher.get_normalized_name
+        classify_ip_type = Channel.classify_ip_type
+        seen_add = seen_urls.add
+        online_append = online.append
+        ipv4_append = ipv4_channels.append
+        ipv6_append = ipv6_channels.append
+        
+        for c in channels:
+            url = c.url
+            if c.category == UNCATEGORIZED:
+                name = normalize(c)
+                uncategorized[c.original_category].append((name.lower(), name, url))
+                continue
+            if c.status != STATUS_ONLINE or url in seen_urls:
+                continue
+            seen_add(url)
+            online_append(c)
+            if classify_ip_type(url) == "ipv6":
+                ipv6_append(c)
+            else:
+                ipv4_append(c)
+        return ExportPartition(uncategorized, online, ipv4_channels, ipv6_channels)
 
     def _export_all(self, channels: List[Channel]) -> None:
         """主文件导出（确保不含未分类频道）"""
@@ -129,44 +193,48 @@ class ResultExporter:
         )
 
     def _export_m3u(self, channels: List[Channel], file_path: Path) -> int:
-        """M3U格式导出"""
-        online_channels = [c for c in channels if c.status == 'online']
+        """M3U格式导出（批量写入，频道需已过滤去重）"""
+        # 循环外预取台标模板（避免逐频道查询configparser）
+        logo_template = self.config.get('EXPORTER', 'm3u_logo_url', fallback='')
+        format_logo = logo_template.format if logo_template else None
+        
+        lines = [self._get_m3u_header()]
+        append = lines.append
+        for channel in channels:
+            name = channel.name
+            category = channel.category
+            logo_url = format_logo(
+                name=_quote(name),
+                category=_quote(category)
+            ) if format_logo else ''
+            append(f'#EXTINF:-1 tvg-name="{name}" group-title="{category}" tvg-logo="{logo_url}",{name}\n')
+            append(f"{channel.url}\n")
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(self._get_m3u_header())
-            for channel in online_channels:
-                logo_url = self.config.get('EXPORTER', 'm3u_logo_url', fallback='').format(
-                    name=quote(channel.name),
-                    category=quote(channel.category)
-                )
-                f.write(f'#EXTINF:-1 tvg-name="{channel.name}" group-title="{channel.category}" tvg-logo="{logo_url}",{channel.name}\n')
-                f.write(f"{channel.url}\n")
+        with _open_atomic(file_path, encoding='utf-8', newline='\n') as f:
+            f.writelines(lines)
         
-        return len(online_channels)
+        return len(channels)
 
     def _export_txt(self, channels: List[Channel], file_path: Path) -> int:
-        """TXT格式导出（兼容传统播放器）"""
-        seen_urls = set()
+        """TXT格式导出（兼容传统播放器，批量写入，频道需已过滤去重）"""
         current_category = None
-        count = 0
+        lines = []
+        append = lines.append
         
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for channel in channels:
-                if channel.status != 'online' or channel.url in seen_urls:
-                    continue
-                    
-                seen_urls.add(channel.url)
-                
-                if channel.category != current_category:
-                    if current_category is not None:
-                        f.write("\n")
-                    f.write(f"{channel.category},#genre#\n")
-                    current_category = channel.category
-                
-                f.write(f"{channel.name},{channel.url}\n")
-                count += 1
+        for channel in channels:
+            category = channel.category
+            if category != current_category:
+                if current_category is not None:
+                    append("\n")
+                append(f"{category},#genre#\n")
+                current_category = category
+            
+            append(f"{channel.name},{channel.url}\n")
+        
+        with _open_atomic(file_path, encoding='utf-8', newline='\n') as f:
+            f.writelines(lines)
                 
-        return count
+        return len(channels)
 
     def _export_channels(self, channels: List[Channel], type_name: str) -> None:
         """协议专用文件导出（IPv4/IPv6）"""
@@ -191,31 +259,40 @@ class ResultExporter:
         ))
         csv_output_path.mkdir(parents=True, exist_ok=True)
         history_file = csv_output_path / f"history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        compress = self.config.getboolean('EXPORTER', 'compress_history', fallback=True)
         
         try:
-            with open(history_file, 'w', encoding='utf-8', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'Name', 'URL', 'Category', 'OriginalCategory',
-                    'Status', 'Speed(KB/s)', 'Response(ms)'
-                ])
-                for ch in channels:
-                    writer.writerow([
-                        ch.name, ch.url, ch.category, ch.original_category,
-                        ch.status, ch.download_speed, ch.response_time
-                    ])
+            # 压缩模式下直接流式写入GZ文件，避免先落盘明文再二次压缩
+            if compress:
+                history_file = history_file.with_name(f"{history_file.name}.gz")
+                with _open_atomic(history_file, 'wb') as raw:
+                    gz = gzip.GzipFile(filename=history_file.name, mode='wb', fileobj=raw, compresslevel=6)
+                    with io.TextIOWrapper(
+                        io.BufferedWriter(gz, buffer_size=WRITE_BUFFER_SIZE),
+                        encoding='utf-8',
+                        newline=''
+                    ) as f:
+                        self._write_history_rows(f, channels)
+            else:
+                with _open_atomic(history_file, encoding='utf-8', newline='') as f:
+                    self._write_history_rows(f, channels)
             
-            if self.config.getboolean('EXPORTER', 'compress_history', fallback=True):
-                with open(history_file, 'rb') as f_in:
-                    with gzip.open(f"{history_file}.gz", 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-                history_file.unlink()
-                logger.info(f"历史记录已压缩: {history_file}.gz | 总频道: {len(channels)}")
+            if compress:
+                logger.info(f"历史记录已压缩: {history_file} | 总频道: {len(channels)}")
             else:
                 logger.info(f"历史记录已保存: {history_file} | 总频道: {len(channels)}")
         except Exception as e:
             logger.error(f"历史记录导出失败: {str(e)}")
 
+    def _write_history_rows(self, f, channels: List[Channel]) -> None:
+        """写入历史记录CSV内容"""
+        writer = csv.writer(f)
+        writer.writerow([
+            'Name', 'URL', 'Category', 'OriginalCategory',
+            'Status', 'Speed(KB/s)', 'Response(ms)'
+        ])
+        writer.writerows(map(HISTORY_ROW, channels))
+
     def _get_m3u_header(self) -> str:
         """生成M3U文件头（从配置读取EPG地址）"""
         epg_url = self.config.get(
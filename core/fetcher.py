@@ -3,15 +3,17 @@ import asyncio
 import logging
 from typing import List, Callable
 import re
-from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+CHARSET_PATTERN = re.compile(r'charset=([\w-]+)', re.IGNORECASE)
+
 class SourceFetcher:
     """订阅源获取器（带大小检查和智能重试）"""
     
     def __init__(self, timeout: float, concurrency: int, retries: int = 2, config=None):
         self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.concurrency = concurrency
         self.semaphore = asyncio.Semaphore(concurrency)
         self.retries = retries
         self.config = config or {}
@@ -19,13 +21,23 @@ class SourceFetcher:
         self.max_size = int(self.config.get('FETCHER', 'max_source_size', fallback=50 * 1024 * 1024))
 
     async def fetch_all(self, urls: List[str], progress_cb: Callable) -> List[str]:
-        """批量获取订阅源（带并发控制）"""
-        async with aiohttp.ClientSession(timeout=self.timeout) as session:
+        """批量获取订阅源（带并发控制，共享连接池与DNS缓存）"""
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=8,
+            use_dns_cache=True,
+            ttl_dns_cache=300
+        )
+        async with aiohttp.ClientSession(
+            timeout=self.timeout,
+            connector=connector,
+            headers={'User-Agent': 'Mozilla/5.0'}
+        ) as session:
             tasks = [self._fetch_with_retry(session, url, progress_cb) for url in urls]
             return await asyncio.gather(*tasks)
 
     async def _fetch_with_retry(self, session: aiohttp.ClientSession, url: str, progress_cb: Callable) -> str:
-        """带重试机制的请求处理"""
+        """带重试机制的请求处理（每个URL独立指数退避重试，只推进一次进度）"""
         for attempt in range(self.retries + 1):
             try:
                 result = await self._fetch(session, url)
@@ -34,44 +46,49 @@ class SourceFetcher:
             except Exception as e:
                 logger.warning(f"Attempt {attempt+1}/{self.retries+1} failed: {url} - {str(e)}")
                 if attempt == self.retries:
+                    progress_cb()
                     return ""
-                await asyncio.sleep(1 + attempt)
-            finally:
-                progress_cb()
+                await asyncio.sleep(2 ** attempt)
 
     async def _fetch(self, session: aiohttp.ClientSession, url: str) -> str:
         """执行单次请求（带大小检查）"""
         async with self.semaphore:
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            async with session.get(url, headers=headers) as resp:
+            async with session.get(url) as resp:
                 # 检查状态码
                 if resp.status != 200:
                     raise ValueError(f"HTTP status {resp.status}")
                 
-                # 处理内容编码
-                raw_content = await resp.read()
+                # 声明大小超限时直接拒绝，不读取响应体
+                if resp.content_length is not None and resp.content_length > self.max_size:
+                    raise ValueError(self._size_error(resp.content_length))
                 
-                # 检查实际下载大小
-                if len(raw_content) > self.max_size:
-                    raise ValueError(
-                        f"Content too large ({len(raw_content)/1024/1024:.1f}MB > {self.max_size/1024/1024:.1f}MB)"
-                    )
+                # 分块读取，超过大小限制立即中止
+                raw_content = bytearray()
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    raw_content.extend(chunk)
+                    if len(raw_content) > self.max_size:
+                        raise ValueError(self._size_error(len(raw_content)))
                 
-                encoding = self._detect_encoding(resp.headers.get('Content-Type', ''), raw_content)
-                return raw_content.decode(encoding, errors='replace')
+                # 处理内容编码
+                return self._decode(resp.headers.get('Content-Type', ''), raw_content)
+
+    def _size_error(self, size: int) -> str:
+        """生成内容超限错误信息"""
+        return f"Content too large ({size/1024/1024:.1f}MB > {self.max_size/1024/1024:.1f}MB)"
 
-    @lru_cache(maxsize=128)
-    def _detect_encoding(self, content_type: str, raw_content: bytes) -> str:
-        """检测内容编码（带缓存）"""
-        if 'charset=' in content_type:
-            if match := re.search(r'charset=([\w-]+)', content_type, re.IGNORECASE):
-                return match.group(1).lower()
+    def _decode(self, content_type: str, raw_content: bytes) -> str:
+        """
+        解码响应内容：依次用Content-Type声明的编码与常见编码对全文严格解码，
+        首个成功的编码胜出；全部失败时才按utf-8替换非法字节
+        """
+        candidates = list(self.common_encodings)
+        if match := CHARSET_PATTERN.search(content_type):
+            candidates.insert(0, match.group(1).lower())
         
-        for enc in self.common_encodings:
+        for enc in candidates:
             try:
-                raw_content.decode(enc)
-                return enc
-            except UnicodeDecodeError:
+                return raw_content.decode(enc)
+            except (UnicodeDecodeError, LookupError):
                 continue
         
-        return 'utf-8'
\ No newline at end of file
+        return raw_content.decode('utf-8', errors='replace')
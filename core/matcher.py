@@ -3,19 +3,29 @@ import time
 import logging
 from typing import Dict, List, Set, Tuple
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from .models import Channel
+from .models import Channel, UNCATEGORIZED
 import configparser
 from collections import defaultdict
-from dataclasses import dataclass
+
+try:
+    import ahocorasick  # 依赖：pyahocorasick，用于字面量别名的多模式匹配（缺失时回退为逐条正则匹配）
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class MatchCache:
-    """分类匹配缓存数据结构（优化内存使用）"""
-    category: str
-    normalized_name: str
+# 正则元字符（不含这些字符的别名按纯字面量处理）
+REGEX_META_PATTERN = re.compile(r'[.^$*+?{}\[\]\\|()]')
+# 数字反向引用（如\1），含此写法的正则不参与合并
+BACKREFERENCE_PATTERN = re.compile(r'\\[1-9]')
+
+# 频道名清理规则（预编译）
+ALNUM_CJK_SPACE_PATTERN = re.compile(r'([a-zA-Z0-9]+)\s+([\u4e00-\u9fa5])')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SEPARATOR_TRANSLATION = str.maketrans({'_': ' ', '-': ' '})
+
+# 模板中的后缀声明（如"#suffixes:高清,HD"）
+SUFFIXES_PATTERN = re.compile(r'#suffixes:(.*)')
 
 class AutoCategoryMatcher:
     """智能分类匹配器（高性能优化版）"""
@@ -33,90 +43,101 @@ class AutoCategoryMatcher:
         self.enable_space_clean = self.config.getboolean('MATCHER', 'enable_space_clean', fallback=True)
         
         # 初始化缓存和统计
-        self.match_cache: Dict[str, MatchCache] = {}
+        self.match_cache: Dict[str, str] = {}  # {channel_name: category}
         self.name_normalization_cache: Dict[str, str] = {}
-        self.template_order_cache: Dict[tuple, Dict[str, int]] = {}  # {channel_names_tuple: {name: index}}
+        self.clean_name_cache: Dict[str, str] = {}
         
         # 加载模板数据
-        self.categories, self.standard_names = self._parse_template()
-        self.suffixes = self._extract_suffixes()
-        self.template_order = self._load_template_order()
+        self.categories, self.standard_names, self.template_order, self.suffixes = self._parse_template()
+        self.suffix_pattern = self._compile_suffix_pattern()
+        self.template_order_index: Dict[str, Dict[str, int]] = {  # {category: {name: index}}
+            category: {name: i for i, name in enumerate(names)}
+            for category, names in self.template_order.items()
+        }
+        self._build_match_index()
         
         logger.info(f"分类器初始化完成 | 模板规则: {sum(len(p) for p in self.categories.values())}条")
 
     def _clean_channel_name(self, name: str) -> str:
-        """清理频道名称（优化：使用缓存+批量处理）"""
+        """清理频道名称（优化：使用缓存+预编译正则）"""
         if not name or not self.enable_space_clean:
             return name
+        
+        cached = self.clean_name_cache.get(name)
+        if cached is not None:
+            return cached
             
         # 1. 去除首尾空格和特殊字符
-        cleaned = name.strip().replace('_', ' ').replace('-', ' ')
+        cleaned = name.strip().translate(SEPARATOR_TRANSLATION)
         # 2. 移除字母/数字与汉字之间的空格
-        cleaned = re.sub(r'([a-zA-Z0-9]+)\s+([\u4e00-\u9fa5])', r'\1\2', cleaned)
+        cleaned = ALNUM_CJK_SPACE_PATTERN.sub(r'\1\2', cleaned)
         # 3. 合并多余空格
-        return re.sub(r'\s+', ' ', cleaned)
+        cleaned = WHITESPACE_PATTERN.sub(' ', cleaned)
+        
+        self.clean_name_cache[name] = cleaned
+        return cleaned
 
-    def _extract_suffixes(self) -> List[str]:
-        """从模板中提取后缀配置（优化：使用正则预编译）"""
-        suffix_pattern = re.compile(r'#suffixes:(.*)')
-        try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if match := suffix_pattern.search(line):
-                        return [s.strip().lower() for s in match.group(1).split(',') if s.strip()]
-        except Exception as e:
-            logger.error(f"后缀提取失败: {str(e)}")
-        return ["高清", "hd", "综合"]  # 默认后缀
+    def _compile_suffix_pattern(self):
+        """将后缀列表编译为单个锚定结尾的正则（长后缀优先，忽略大小写）"""
+        if not self.suffixes:
+            return None
+        alternatives = '|'.join(re.escape(s) for s in sorted(self.suffixes, key=len, reverse=True))
+        return re.compile(f'(?:{alternatives})\\Z', re.IGNORECASE)
 
-    def _parse_template(self) -> Tuple[Dict[str, List[re.Pattern]], Dict[str, str]]:
+    def _parse_template(self) -> Tuple[Dict[str, List[re.Pattern]], Dict[str, str], Dict[str, List[str]], List[str]]:
         """
-        解析模板文件（优化：并行处理+预编译正则）
-        返回: (categories, standard_names)
+        流式解析模板文件（单次遍历同时构建分类规则、名称映射、频道顺序和后缀配置）
+        返回: (categories, standard_names, template_order, suffixes)
         """
         categories = defaultdict(list)
         standard_names = {}
+        template_order = {}
+        suffixes = None
         current_category = None
         
         try:
             with open(self.template_path, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-                
-                # 并行处理正则编译
-                with ThreadPoolExecutor() as executor:
-                    futures = []
-                    for line in lines:
-                        if line.endswith(',#genre#'):
-                            current_category = line.split(',')[0]
-                            continue
-                            
-                        if current_category:
-                            parts = line.split('|')
-                            standard_name = parts[0].strip()
-                            futures.append(
-                                executor.submit(
-                                    self._compile_patterns,
-                                    parts,
-                                    current_category,
-                                    standard_name
-                                )
-                            )
+                for raw_line in f:
+                    # 后缀配置取第一条出现的#suffixes:声明
+                    if suffixes is None and (match := SUFFIXES_PATTERN.search(raw_line)):
+                        suffixes = [s.strip().lower() for s in match.group(1).split(',') if s.strip()]
+                    
+                    line = raw_line.strip()
+                    if not line or raw_line.startswith('#'):
+                        continue
                     
-                    for future in as_completed(futures):
-                        category, patterns, name_mappings = future.result()
-                        categories[category].extend(patterns)
-                        standard_names.update(name_mappings)
+                    if line.endswith(',#genre#'):
+                        current_category = line.split(',')[0]
+                        template_order[current_category] = []
+                        continue
                         
+                    if current_category:
+                        parts = line.split('|')
+                        standard_name = parts[0].strip()
+                        template_order[current_category].append(standard_name)
+                        # 顺序编译（re.compile受GIL限制，线程池只会增加开销并打乱模板顺序）
+                        self._compile_patterns(
+                            parts,
+                            standard_name,
+                            categories[current_category],
+                            standard_names
+                        )
+                    
         except Exception as e:
             logger.error(f"模板解析失败: {str(e)}")
             raise
+        
+        if suffixes is None:
+            suffixes = ["高清", "hd", "综合"]  # 默认后缀
             
-        return dict(categories), standard_names
+        return dict(categories), standard_names, template_order, suffixes
 
-    def _compile_patterns(self, parts: List[str], category: str, standard_name: str) -> Tuple[str, List[re.Pattern], Dict[str, str]]:
-        """编译正则模式并构建名称映射（子任务函数）"""
-        patterns = []
-        name_mappings = {}
-        
+    def _compile_patterns(self,
+                          parts: List[str],
+                          standard_name: str,
+                          patterns: List[re.Pattern],
+                          standard_names: Dict[str, str]) -> None:
+        """编译正则模式并构建名称映射（直接写入分类规则列表和映射表）"""
         for name in parts:
             name = name.strip()
             if not name:
@@ -129,76 +150,122 @@ class AutoCategoryMatcher:
                 
                 # 构建标准化名称映射
                 clean_name = self._clean_channel_name(name)
-                name_mappings[clean_name.lower()] = standard_name
+                standard_names[clean_name.lower()] = standard_name
             except re.error as e:
                 logger.warning(f"正则编译跳过: {name} ({str(e)})")
-                
-        return category, patterns, name_mappings
 
-    def batch_match(self, channel_names: List[str]) -> Dict[str, str]:
+    def _build_match_index(self):
         """
-        批量匹配分类（优化：并行处理+缓存）
-        返回: {channel_name: category}
+        构建匹配索引：字面量别名进入Aho-Corasick自动机（需安装pyahocorasick），
+        其余真正的正则保留在按分类顺序排列的列表中
         """
-        if not channel_names:
-            return {}
-            
-        # 小批量直接处理
-        if len(channel_names) <= 1000:
-            return {name: self.match(name) for name in channel_names}
+        self.category_order = list(self.categories)
+        self.literal_automaton = None
+        self.regex_rules: List[Tuple[str, List[re.Pattern]]] = []
         
-        # 并行处理
-        threads = self.config.getint('PERFORMANCE', 'classification_threads', fallback=4)
-        batch_size = self.config.getint('PERFORMANCE', 'classification_batch_size', fallback=1000)
-        
-        logger.debug(f"启动并行分类 | 总数: {len(channel_names)} | 线程: {threads}")
+        automaton = ahocorasick.Automaton() if ahocorasick else None
+        for index, (category, patterns) in enumerate(self.categories.items()):
+            regex_patterns = []
+            for pattern in patterns:
+                literal = pattern.pattern
+                if automaton is not None and not REGEX_META_PATTERN.search(literal):
+                    # 同一别名出现在多个分类时保留最靠前的分类
+                    if automaton.get(literal, index) >= index:
+                        automaton.add_word(literal, index)
+                else:
+                    regex_patterns.append(pattern)
+            self.regex_rules.append((category, self._fuse_patterns(regex_patterns)))
         
-        results = {}
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            futures = {
-                executor.submit(
-                    self._process_batch, 
-                    channel_names[i:i+batch_size]
-                ): i for i in range(0, len(channel_names), batch_size)
-            }
-            
-            for future in as_completed(futures):
-                results.update(future.result())
-                
-        return results
+        if automaton is not None and len(automaton):
+            automaton.make_automaton()
+            self.literal_automaton = automaton
+            logger.debug(f"字面量自动机构建完成 | 别名数: {len(automaton)}")
+
+    def _fuse_patterns(self, patterns: List[re.Pattern]) -> List[re.Pattern]:
+        """
+        将同一分类的多条正则合并为单个交替表达式（一次search替代逐条循环）
+        含数字反向引用的正则合并后分组编号会错位，单独保留逐条匹配
+        """
+        fusible = [p for p in patterns if not BACKREFERENCE_PATTERN.search(p.pattern)]
+        standalone = [p for p in patterns if BACKREFERENCE_PATTERN.search(p.pattern)]
+        if len(fusible) <= 1:
+            return patterns
+        try:
+            fused = re.compile('|'.join(f'(?:{p.pattern})' for p in fusible))
+        except re.error:
+            # 含内联标志等无法合并的写法时保持逐条匹配
+            return patterns
+        return [fused] + standalone
+
+    @property
+    def has_templates(self) -> bool:
+        """是否加载到了分类规则（为False时所有频道都会归入"未分类"）"""
+        return bool(self.categories)
+
+    def batch_match(self, channel_names: List[str]) -> Dict[str, str]:
+        """
+        批量匹配分类（单线程顺序匹配：匹配受GIL限制，线程池只会增加调度开销）
+        返回: {channel_name: category}
+        """
+        match = self.match
+        return {name: match(name) for name in channel_names}
 
-    def _process_batch(self, names: List[str]) -> Dict[str, str]:
-        """处理单个批次的分类匹配"""
-        return {name: self.match(name) for name in names}
+    def batch_normalize(self, channel_names: List[str]) -> Dict[str, str]:
+        """
+        批量标准化频道名称
+        返回: {channel_name: normalized_name}
+        """
+        normalize = self.normalize_channel_name
+        return {name: normalize(name) for name in channel_names}
 
     def match(self, channel_name: str) -> str:
         """
-        匹配单个频道分类（优化：三级缓存）
+        匹配单个频道分类（结果按原始名称缓存在match_cache中）
         返回: 分类名称
         """
-        # 第一级缓存检查
-        if channel_name in self.match_cache:
-            return self.match_cache[channel_name].category
+        # 已匹配过的名称直接返回
+        cache = self.match_cache
+        cached = cache.get(channel_name)
+        if cached is not None:
+            return cached
             
-        # 清理名称并检查第二级缓存
-        clean_name = self._clean_channel_name(channel_name)
-        normalized_name = self.normalize_channel_name(clean_name)
+        # 清理并标准化名称（清理与标准化各自带缓存）
+        normalized_name = self.normalize_channel_name(self._clean_channel_name(channel_name))
+        
+        # 按模板顺序匹配分类并写入缓存
+        category = self._match_template(normalized_name)
+        cache[channel_name] = category
+        return category
+
+    def _match_template(self, normalized_name: str) -> str:
+        """
+        按模板顺序匹配分类，首个命中的分类胜出，未命中返回"未分类"
+        字面量别名一次扫描得到最靠前的命中分类，正则只需检查排在它之前的分类
+        """
+        category_order = self.category_order
+        literal_index = len(category_order)
+        automaton = self.literal_automaton
+        if automaton is not None:
+            for _, index in automaton.iter(normalized_name):
+                if index < literal_index:
+                    literal_index = index
         
-        # 第三级缓存：模板匹配
-        for category, patterns in self.categories.items():
+        for index, (category, patterns) in enumerate(self.regex_rules):
+            if index >= literal_index:
+                break
             for pattern in patterns:
                 if pattern.search(normalized_name):
-                    self.match_cache[channel_name] = MatchCache(category, normalized_name)
                     return category
-                    
-        # 未匹配情况
-        self.match_cache[channel_name] = MatchCache("未分类", normalized_name)
-        return "未分类"
+        
+        if literal_index < len(category_order):
+            return category_order[literal_index]
+        return UNCATEGORIZED
 
     def normalize_channel_name(self, name: str) -> str:
         """标准化频道名称（优化：缓存+后缀处理）"""
-        if name in self.name_normalization_cache:
-            return self.name_normalization_cache[name]
+        cached = self.name_normalization_cache.get(name)
+        if cached is not None:
+            return cached
             
         clean_name = self._clean_channel_name(name)
         
@@ -206,10 +273,8 @@ class AutoCategoryMatcher:
         normalized_name = self.standard_names.get(clean_name.lower(), clean_name)
         
         # 处理后缀（如"CCTV1高清" -> "CCTV1"）
-        for suffix in self.suffixes:
-            if normalized_name.lower().endswith(suffix):
-                normalized_name = normalized_name[:-len(suffix)]
-                break
+        if self.suffix_pattern is not None:
+            normalized_name = self.suffix_pattern.sub('', normalized_name, count=1)
                 
         self.name_normalization_cache[name] = normalized_name
         return normalized_name
@@ -224,75 +289,51 @@ class AutoCategoryMatcher:
         # 白名单频道优先
         whitelist_channels = [
             c for c in channels 
-            if c.name.lower() in whitelist
+            if c.get_name_lower() in whitelist
         ]
+        whitelist_ids = {id(c) for c in whitelist_channels}
         
-        # 按模板顺序排序其他频道
+        # 单次遍历按分类分桶（不在模板中的分类按原顺序放入末尾）
+        buckets = defaultdict(list)
+        uncategorized = []
+        template_order = self.template_order
+        for c in channels:
+            if id(c) in whitelist_ids:
+                continue
+            if c.category in template_order:
+                buckets[c.category].append(c)
+            else:
+                uncategorized.append(c)
+        
+        # 按模板顺序排序各分类频道
         sorted_channels = []
-        for category in self.template_order:
-            category_channels = [
-                c for c in channels 
-                if c not in whitelist_channels and c.category == category
-            ]
+        for category, names in template_order.items():
+            category_channels = buckets.get(category)
+            if not category_channels:
+                continue
+            order_map = self.template_order_index[category]
+            missing = len(names)
             sorted_channels.extend(
                 sorted(
                     category_channels,
-                    key=lambda c: self._get_channel_order(c, self.template_order[category])
+                    key=lambda c: order_map.get(self.get_normalized_name(c), missing)
                 )
             )
         
         # 添加未分类频道
-        uncategorized = [
-            c for c in channels 
-            if c not in whitelist_channels 
-            and c.category not in self.template_order
-        ]
         sorted_channels.extend(uncategorized)
         
         return whitelist_channels + sorted_channels
 
-    def _get_channel_order(self, 
-                         channel: Channel, 
-                         channel_names: List[str]) -> int:
-        """获取频道在模板中的顺序（优化：缓存索引）"""
-        cache_key = tuple(channel_names)
-        if cache_key not in self.template_order_cache:
-            self.template_order_cache[cache_key] = {
-                name: i for i, name in enumerate(channel_names)
-            }
-            
-        clean_name = self.normalize_channel_name(channel.name)
-        return self.template_order_cache[cache_key].get(clean_name, len(channel_names))
-
-    def _load_template_order(self) -> Dict[str, List[str]]:
-        """加载模板中的频道顺序（优化：按需加载）"""
-        template_order = {}
-        current_category = None
-        
-        try:
-            with open(self.template_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                        
-                    if line.endswith(',#genre#'):
-                        current_category = line.split(',')[0]
-                        template_order[current_category] = []
-                        continue
-                        
-                    if current_category:
-                        parts = line.split('|')
-                        if parts:
-                            template_order[current_category].append(parts[0].strip())
-        except Exception as e:
-            logger.error(f"模板顺序加载失败: {str(e)}")
-            
-        return template_order
+    def get_normalized_name(self, channel: Channel) -> str:
+        """获取频道标准化名称（优先使用分类阶段缓存在频道上的结果）"""
+        if channel.normalized_name is not None:
+            return channel.normalized_name
+        return self.normalize_channel_name(channel.name)
 
     def clear_cache(self):
         """清空缓存（用于长时间运行的服务）"""
         self.match_cache.clear()
         self.name_normalization_cache.clear()
-        self.template_order_cache.clear()
+        self.clean_name_cache.clear()
         logger.info("分类器缓存已清空")
\ No newline at end of file
@@ -1,19 +1,15 @@
-import re
-from typing import ClassVar
+import sys
+from typing import Optional
+
+# 高频比较的状态/分类哨兵值（驻留后相等比较可直接按对象身份短路）
+UNCATEGORIZED = sys.intern("未分类")
+STATUS_ONLINE = sys.intern("online")
+STATUS_OFFLINE = sys.intern("offline")
 
 class Channel:
     """频道数据模型（内存优化版）"""
     __slots__ = ['name', 'url', 'category', 'original_category', 
-                'status', 'response_time', 'download_speed']
-
-    # 类变量（静态变量）定义
-    IPV4_PATTERN: ClassVar[re.Pattern] = re.compile(
-        r'https?://(?:\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})(?::\d+)?'
-    )
-    
-    IPV6_PATTERN: ClassVar[re.Pattern] = re.compile(
-        r'https?://(?:\[[0-9a-fA-F:]+\]|[0-9a-fA-F]*:[0-9a-fA-F:]+)'
-    )
+                'status', 'response_time', 'download_speed', 'normalized_name', 'name_lower']
 
     def __init__(self, 
                  name: str, 
@@ -22,16 +18,26 @@ class Channel:
                  original_category: str = "未分类",
                  status: str = "pending",
                  response_time: float = 0.0,
-                 download_speed: float = 0.0):
+                 download_speed: float = 0.0,
+                 normalized_name: Optional[str] = None,
+                 name_lower: Optional[str] = None):
         self.name = name
         self.url = url
-        self.category = category
-        self.original_category = original_category
-        self.status = status
+        # 低基数字符串驻留，所有频道共享同一对象（省内存且比较更快）
+        self.category = sys.intern(category)
+        self.original_category = sys.intern(original_category)
+        self.status = sys.intern(status)
         self.response_time = response_time
         self.download_speed = download_speed
+        self.normalized_name = normalized_name  # 分类后缓存的标准化名称（供排序/导出复用）
+        self.name_lower = name_lower  # 分类后缓存的小写名称（供白名单检查复用）
+
+    def get_name_lower(self) -> str:
+        """获取小写名称（优先使用分类阶段缓存的结果）"""
+        name_lower = self.name_lower
+        return name_lower if name_lower is not None else self.name.lower()
 
     @classmethod
     def classify_ip_type(cls, url: str) -> str:
-        """分类IP类型: ipv4 或 ipv6"""
-        return "ipv6" if cls.IPV6_PATTERN.search(url) else "ipv4"
\ No newline at end of file
+        """分类IP类型: ipv4 或 ipv6（IPv6地址在URL中总以方括号包裹主机）"""
+        return "ipv6" if "://[" in url else "ipv4"
\ No newline at end of file
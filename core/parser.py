@@ -1,7 +1,6 @@
 import re
-from typing import Generator, List
+from typing import Generator
 import logging
-from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 from .models import Channel
 from functools import lru_cache
 
@@ -11,13 +10,15 @@ class PlaylistParser:
     """M3U解析器（支持源分类保留）"""
     
     CHANNEL_REGEX = re.compile(r'^(.*?),(http.*)$', re.MULTILINE)
-    EXTINF_REGEX = re.compile(
-        r'#EXTINF:-?[\d.]*,?(.*?)(?:\s+tvg-name="([^"]*)")?(?:\s+tvg-logo="([^"]*)")?(?:\s+group-title="([^"]*)")?.*\n(.*)',
-        re.IGNORECASE
-    )
     GROUP_TITLE_REGEX = re.compile(r'group-title="([^"]+)"')
+    EXTINF_NAME_REGEX = re.compile(r'#EXTINF:-?\d+,(.*)')
     TVG_NAME_REGEX = re.compile(r'tvg-name="([^"]+)"')
     TVG_LOGO_REGEX = re.compile(r'tvg-logo="([^"]+)"')
+    # 逐行扫描器：EXTINF行 / http开头的URL行 / "名称,http..."行（其余行直接跳过）
+    LINE_SCANNER = re.compile(
+        r'^[^\S\n]*(?:(?P<extinf>#EXTINF[^\n]*)|(?P<url>http[^\n]*)|(?P<name>[^\n]*?),(?P<pair_url>http[^\n]*))',
+        re.MULTILINE
+    )
     
     def __init__(self, config=None):
         self.config = config
@@ -27,83 +28,50 @@ class PlaylistParser:
             self.params_to_remove = {p.strip() for p in params.split(',') if p.strip()}
 
     def parse(self, content: str) -> Generator[Channel, None, None]:
-        """解析内容生成频道列表（保留原始分类）"""
-        lines = content.splitlines()
-        batch_size = min(1000, len(lines) // 10 or 100)
-        
+        """
+        解析内容生成频道列表（保留原始分类）
+        单个预编译扫描器直接遍历全文，不再拆分行列表，EXTINF与URL跨行配对不受分批影响
+        """
         current_category = None
-        current_extinf = None
-        for i in range(0, len(lines), batch_size):
-            batch = lines[i:i+batch_size]
-            for channel in self._parse_batch(batch, current_category, current_extinf):
-                current_category = channel.original_category
-                yield channel
-
-    def _parse_batch(self, batch: List[str], current_category: str, current_extinf: str) -> Generator[Channel, None, None]:
-        """解析内容批次（带分类提取）"""
-        channel_matches = []
+        pending_name = None  # 最近一条EXTINF提取出的频道名（等待URL行配对）
         
-        for line in batch:
-            line = line.strip()
-            if not line:
+        for match in self.LINE_SCANNER.finditer(content):
+            extinf, url, name, pair_url = match.group('extinf', 'url', 'name', 'pair_url')
+            
+            if extinf is not None:
+                # EXTINF行只解析一次：名称与group-title在此提取，URL行直接复用
+                extinf = extinf.rstrip()
+                pending_name = self._clean_name(extinf)
+                if group_match := self.GROUP_TITLE_REGEX.search(extinf):
+                    current_category = group_match.group(1)
                 continue
-                
-            if line.startswith('#EXTINF'):
-                current_extinf = line
-                # 从EXTINF行提取group-title
-                if match := self.GROUP_TITLE_REGEX.search(line):
-                    current_category = match.group(1)
-                elif match := self.EXTINF_REGEX.match(line):
-                    if match.group(4):  # group-title from EXTINF_REGEX
-                        current_category = match.group(4)
-            elif current_extinf and line.startswith('http'):
-                # 处理完整的EXTINF + URL组合
-                if match := self.EXTINF_REGEX.match(current_extinf):
-                    name = match.group(2) or match.group(1)  # 优先使用tvg-name
-                    logo = match.group(3)
-                    group_title = match.group(4) or current_category
-                    
-                    channel_matches.append((
-                        name.strip() if name else self._clean_name(current_extinf),
-                        line,
-                        group_title or "未分类",
-                        logo
-                    ))
-                else:
-                    channel_matches.append((
-                        self._clean_name(current_extinf),
-                        line,
-                        current_category or "未分类",
-                        None
-                    ))
-                current_extinf = None
-            else:
-                if match := self.CHANNEL_REGEX.match(line):
-                    channel_matches.append((match.group(1), match.group(2), current_category, None))
-                elif match := self.EXTINF_REGEX.match(line):
-                    name = match.group(2) or match.group(1)
-                    channel_matches.append((
-                        name.strip() if name else self._clean_name(line),
-                        match.group(5),
-                        match.group(4) or current_category or "未分类",
-                        match.group(3)
-                    ))
+            
+            if url is not None:
+                if pending_name is not None:
+                    # 处理完整的EXTINF + URL组合
+                    yield self._make_channel(pending_name, url, current_category)
+                    pending_name = None
+                    continue
+                # 无待配对EXTINF时按"名称,URL"格式解析
+                if not (pair_match := self.CHANNEL_REGEX.match(url.strip())):
+                    continue
+                name, pair_url = pair_match.groups()
+            
+            yield self._make_channel(name, pair_url, current_category)
 
-        for name, url, category, logo in channel_matches:
-            channel = Channel(
-                name=self._clean_name(name),
-                url=self._clean_url(url),
-                original_category=category or "未分类"  # 确保始终有分类
-            )
-            if logo:
-                channel.logo = logo
-            yield channel
+    def _make_channel(self, name: str, url: str, category: str) -> Channel:
+        """构建频道对象"""
+        return Channel(
+            name=self._clean_name(name),
+            url=self._clean_url(url),
+            original_category=category or "未分类"  # 确保始终有分类
+        )
 
     def _clean_name(self, raw_name: str) -> str:
         """清理频道名称（保留原始名称）"""
         # 处理EXTINF行中的名称
         if raw_name.startswith('#EXTINF'):
-            if match := re.search(r'#EXTINF:-?\d+,(.*)', raw_name):
+            if match := self.EXTINF_NAME_REGEX.search(raw_name):
                 return match.group(1).strip()
             return raw_name.split(',')[-1].strip()
         
@@ -111,18 +79,20 @@ class PlaylistParser:
         return raw_name.split(',')[-1].strip()
 
     def _clean_url(self, raw_url: str) -> str:
-        """清理URL（带参数过滤）"""
+        """清理URL（带参数过滤，仅在确有需要移除的参数时重组URL）"""
         url = raw_url.split('$')[0].strip()
         
-        if self.params_to_remove:
-            try:
-                parsed = urlparse(url)
-                if parsed.query:
-                    query_params = parse_qs(parsed.query, keep_blank_values=True)
-                    filtered_params = {k: v for k, v in query_params.items() if k not in self.params_to_remove}
-                    new_query = urlencode(filtered_params, doseq=True)
-                    url = urlunparse(parsed._replace(query=new_query))
-            except Exception as e:
-                logger.warning(f"URL参数处理失败: {url}, 错误: {str(e)}")
+        if not self.params_to_remove:
+            return url
+        
+        address, hash_mark, fragment = url.partition('#')
+        if '?' not in address:
+            return url
+        
+        base, _, query = address.partition('?')
+        params = query.split('&')
+        kept = [p for p in params if p.partition('=')[0] not in self.params_to_remove]
+        if len(kept) == len(params):
+            return url
         
-        return url
\ No newline at end of file
+        return base + ('?' + '&'.join(kept) if kept else '') + hash_mark + fragment
@@ -1,3 +1,4 @@
+import sys
 import time
 import math
 import logging
@@ -22,8 +23,6 @@ class SmartProgress:
         self.last_speed = 0.0
 
         # 进度条状态控制
-        self._update_interval_counter = 0
-        self._completed_at_last_update = 0
         self._is_completed = False
 
         # 自动计算初始更新间隔
@@ -39,27 +38,29 @@ class SmartProgress:
             self.update_interval = 20
         else:
             self.update_interval = max(50, self.total // 200)
+        
+        # 向上取整为2的幂，热路径只需位运算判断是否跨过刷新边界
+        self.update_interval = 1 << (self.update_interval - 1).bit_length()
+        self._mask = self.update_interval - 1
 
     def update(self, n: int = 1):
         """安全更新进度（防溢出）"""
         if self._is_completed:
             return
             
-        # 确保不会超过总量
-        actual_n = min(n, self.total - self.completed)
-        self.completed += actual_n
+        previous = self.completed
+        self.completed = completed = previous + n
         
-        # 检测是否完成
-        if self.completed >= self.total:
+        # 检测是否完成（超出总量时修正为精确值）
+        if completed >= self.total:
             self._is_completed = True
-            self.completed = self.total  # 修正为精确值
+            self.completed = self.total
             self._update_display(force=True)
             return
-            
-        self._update_interval_counter += actual_n
-        if self._update_interval_counter >= self.update_interval:
+        
+        # 高位变化即跨过了update_interval的整数倍
+        if (previous ^ completed) > self._mask:
             self._update_display()
-            self._update_interval_counter = 0
 
     def _update_display(self, force: bool = False):
         """更新进度显示（改进剩余时间估算）"""
@@ -123,7 +124,9 @@ class SmartProgress:
             f"{speed_indicator}"
         )
         
-        print(status, end='', flush=True)
+        # 非强制重绘已由上方的最小更新间隔节流，每次重绘直接写出
+        sys.stdout.write(status)
+        sys.stdout.flush()
 
     def _format_time(self, seconds: float) -> str:
         """智能时间格式转换"""
@@ -1,16 +1,53 @@
 import asyncio
 import aiohttp
 import time
-import re
+import socket
+import ipaddress
 import logging
 from typing import List, Set, Tuple, Optional, Dict, Callable
-from collections import defaultdict
+from collections import Counter, defaultdict
+from itertools import islice
 from urllib.parse import urlparse
 from configparser import ConfigParser
-from .models import Channel
+from .models import Channel, STATUS_ONLINE, STATUS_OFFLINE
+
+try:
+    import diskcache  # 可选依赖：diskcache，用于跨运行持久化测速结果
+except ImportError:
+    diskcache = None
 
 logger = logging.getLogger(__name__)
 
+# UDP/RTP协议头前缀
+UDP_SCHEMES = ('udp://', 'rtp://')
+
+# 测速提前结束阈值：持续足够时间后速度已明显达标/不达标即停止下载
+EARLY_PASS_NS = 500_000_000      # 0.5秒后速度≥1.5倍阈值判定通过
+EARLY_PASS_RATIO = 1.5
+EARLY_FAIL_NS = 2_000_000_000    # 2秒后速度<0.5倍阈值判定失败
+EARLY_FAIL_RATIO = 0.5
+
+class _DatagramCounter(asyncio.DatagramProtocol):
+    """UDP测速协议：统计收到的字节数，记录首包时间"""
+
+    def __init__(self, byte_limit: int):
+        loop = asyncio.get_running_loop()
+        self.byte_limit = byte_limit
+        self.bytes_received = 0
+        self.first_packet = loop.create_future()
+        self.limit_reached = loop.create_future()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if not self.first_packet.done():
+            self.first_packet.set_result(time.perf_counter_ns())
+        self.bytes_received += len(data)
+        if self.bytes_received >= self.byte_limit and not self.limit_reached.done():
+            self.limit_reached.set_result(None)
+
+    def error_received(self, exc: Exception) -> None:
+        if not self.first_packet.done():
+            self.first_packet.set_exception(exc)
+
 class SpeedTester:
     """高性能流媒体测速引擎（完整优化版）"""
 
@@ -46,12 +83,17 @@ class SpeedTester:
             'max_download_size', 
             fallback=100 * 1024  # 默认100KB
         )
+        self.read_chunk_size = self.config.getint(
+            'TESTER',
+            'read_chunk_size',
+            fallback=128 * 1024  # 默认128KB
+        )
         
         # 初始化日志系统
         self._init_logger()
 
-        # 协议检测
-        self.rtp_udp_pattern = re.compile(r'/(rtp|udp)/', re.IGNORECASE)
+        # URL元信息缓存: url -> (ip, is_udp)
+        self._url_meta: Dict[str, Tuple[str, bool]] = {}
         
         # 协议特定配置
         self.udp_timeout = self.config.getfloat('TESTER', 'udp_timeout', fallback=max(0.5, timeout * 0.3))
@@ -62,19 +104,25 @@ class SpeedTester:
         self.max_channels_per_ip = self.config.getint('TESTER', 'max_channels_per_ip', fallback=100)
         
         # IP防护机制
-        self.failed_ips: Dict[str, int] = defaultdict(int)
+        self.failed_ips: Counter = Counter()
         self.max_failures_per_ip = self.config.getint('PROTECTION', 'max_failures_per_ip', fallback=5)
         self.blocked_ips: Set[str] = set()
         self.ip_cooldown: Dict[str, float] = {}  # IP冷却时间记录
         self.min_ip_interval = self.config.getfloat('PROTECTION', 'min_ip_interval', fallback=0.5)
         
+        # 测速成功结果的跨运行缓存（需安装diskcache且ttl_seconds>0，默认关闭）
+        self.verdict_ttl = self.config.getint('CACHE', 'ttl_seconds', fallback=0)
+        self.verdict_cache = None
+        if self.verdict_ttl > 0 and diskcache is not None:
+            self.verdict_cache = diskcache.Cache(
+                self.config.get('PATHS', 'cache_dir', fallback='cache/tester'))
+        
         # 并发控制
         self.semaphore = asyncio.BoundedSemaphore(self.concurrency)
         
-        # 统计
-        self.success_count = 0
-        self.total_count = 0
-        self.start_time = 0.0
+        # 共享会话（延迟创建，见 _get_session / aclose）
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._session: Optional[aiohttp.ClientSession] = None
 
     def _init_logger(self):
         """初始化日志记录器"""
@@ -86,20 +134,24 @@ class SpeedTester:
 
     def _create_log_method(self):
         """创建带开关的日志方法"""
-        def make_log_method(level):
+        def make_log_method(name, level):
             def log_method(msg, *args, **kwargs):
-                if self._enable_logging:
-                    getattr(self.logger, level)(msg, *args, **kwargs)
+                if self._log_enabled(level):
+                    getattr(self.logger, name)(msg, *args, **kwargs)
             return log_method
         
         return type('LogMethod', (), {
-            'debug': make_log_method('debug'),
-            'info': make_log_method('info'),
-            'warning': make_log_method('warning'),
-            'error': make_log_method('error'),
-            'exception': make_log_method('exception')
+            'debug': make_log_method('debug', logging.DEBUG),
+            'info': make_log_method('info', logging.INFO),
+            'warning': make_log_method('warning', logging.WARNING),
+            'error': make_log_method('error', logging.ERROR),
+            'exception': make_log_method('exception', logging.ERROR)
         })
 
+    def _log_enabled(self, level: int) -> bool:
+        """判断指定级别的日志是否会实际输出（用于跳过日志参数的构造）"""
+        return self._enable_logging and self.logger.isEnabledFor(level)
+
     async def test_channels(self, 
                           channels: List[Channel], 
                           progress_cb: Optional[Callable] = None,
@@ -114,17 +166,16 @@ class SpeedTester:
             failed_urls: 存储失败URL的集合
             white_list: 白名单集合
         """
-        failed_urls = failed_urls or set()
+        failed_urls = set() if failed_urls is None else failed_urls
         white_list = white_list or set()
         progress_cb = progress_cb or (lambda _: None)
         
-        self.total_count = len(channels)
-        self.success_count = 0
-        self.start_time = time.time()
+        batch_total = len(channels)
+        start_time = time.time()
         
         self.log.info(
             "▶️ 开始测速 | 总数: %d | 并发: %d | 单IP最大频道: %d | 最大下载量: %dKB",
-            self.total_count, self.concurrency, self.max_channels_per_ip,
+            batch_total, self.concurrency, self.max_channels_per_ip,
             self.max_download_size // 1024
         )
 
@@ -137,63 +188,93 @@ class SpeedTester:
             sum(len(g) for g in ip_groups.values())/len(ip_groups)
         )
 
-        # 创建自定义connector
-        connector = aiohttp.TCPConnector(
-            limit=self.concurrency,
-            force_close=False,
-            enable_cleanup_closed=True,
-            ssl=False
-        )
-
         try:
-            async with aiohttp.ClientSession(
-                connector=connector,
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
-            ) as session:
-                # 动态批处理
-                batch_size = self._calculate_batch_size(len(ip_groups))
-                tasks = []
-                
-                for ip, group in ip_groups.items():
-                    if ip not in self.blocked_ips:
-                        task = self._process_ip_group(
-                            session, ip, group, progress_cb, failed_urls, white_list)
-                        tasks.append(task)
-                        
-                        if len(tasks) >= batch_size:
-                            await self._safe_gather(tasks)
-                            progress_cb(len(tasks))
-                            tasks = []
-                
-                if tasks:
-                    await self._safe_gather(tasks)
-                    progress_cb(len(tasks))
+            session = await self._get_session()
+            # 滑动窗口：最多window个IP组同时在途，任一组完成立即补入下一组，批次之间没有空等
+            window = self._calculate_batch_size(len(ip_groups))
+            pending = set()
+            
+            for ip, group in ip_groups.items():
+                if ip in self.blocked_ips:
+                    continue
+                if len(pending) >= window:
+                    pending = await self._wait_tasks(pending, asyncio.FIRST_COMPLETED)
+                pending.add(asyncio.ensure_future(self._process_ip_group(
+                    session, ip, group, progress_cb, failed_urls, white_list)))
+            
+            if pending:
+                await self._wait_tasks(pending)
         except Exception as e:
             self.log.error("测试过程中发生错误: %s", str(e))
             if "_abort" not in str(e):
                 raise
-        finally:
-            await connector.close()
         
-        elapsed = time.time() - self.start_time
-        success_rate = (self.success_count / self.total_count) * 100 if self.total_count > 0 else 0
-        self.log.info(
-            "✅ 测速完成 | 成功: %d(%.1f%%) | 失败: %d | 屏蔽IP: %d | 用时: %.1fs",
-            self.success_count, success_rate,
-            self.total_count - self.success_count,
-            len(self.blocked_ips),
-            elapsed
-        )
+        self._compact_ip_state()
+        
+        if self._log_enabled(logging.INFO):
+            # 本批次统计按频道状态计算（白名单频道不计入成功数），不受并发批次干扰
+            elapsed = time.time() - start_time
+            batch_success = sum(1 for c in channels if c.status == STATUS_ONLINE) - len(ip_groups.get("whitelist", ()))
+            success_rate = (batch_success / batch_total) * 100 if batch_total > 0 else 0
+            self.log.info(
+                "✅ 测速完成 | 成功: %d(%.1f%%) | 失败: %d | 屏蔽IP: %d | 用时: %.1fs",
+                batch_success, success_rate,
+                batch_total - batch_success,
+                len(self.blocked_ips),
+                elapsed
+            )
+
+    def _compact_ip_state(self) -> None:
+        """清理过期的IP冷却记录及对应的失败计数，避免跨批次无限增长"""
+        cutoff = time.time() - 10 * self.min_ip_interval
+        self.ip_cooldown = {ip: ts for ip, ts in self.ip_cooldown.items() if ts > cutoff}
+        for ip in [ip for ip in self.failed_ips if ip not in self.ip_cooldown]:
+            del self.failed_ips[ip]
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取共享会话（首次调用时创建，跨批次复用keep-alive连接与DNS缓存）"""
+        if self._session is None or self._session.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.concurrency,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                enable_cleanup_closed=True,
+                ssl=False
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
 
-    async def _safe_gather(self, tasks):
-        """安全执行gather操作"""
+    async def aclose(self) -> None:
+        """关闭共享会话，由调用方在测速结束后调用"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+        if self.verdict_cache is not None:
+            self.verdict_cache.close()
+
+    async def _wait_tasks(self, tasks: Set[asyncio.Future],
+                          return_when: str = asyncio.ALL_COMPLETED) -> Set[asyncio.Future]:
+        """
+        等待任务完成并记录已完成任务中的异常（单个任务失败不影响其他任务）
+        返回仍在运行的任务；自身被取消时一并取消全部任务
+        """
         try:
-            await asyncio.gather(*tasks)
-        except Exception as e:
-            self.log.warning("批处理任务执行异常: %s", str(e))
+            done, pending = await asyncio.wait(tasks, return_when=return_when)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                self.log.warning("批处理任务执行异常: %s", str(task.exception()))
+        return pending
 
     def _calculate_batch_size(self, total_groups: int) -> int:
-        """动态计算批处理大小"""
+        """动态计算同时在途的IP组数量"""
         if total_groups <= 100:
             return total_groups
         elif total_groups <= 1000:
@@ -207,28 +288,28 @@ class SpeedTester:
         改进版IP分组逻辑
         返回: { "ip_0": [ch1,ch2...], "ip_1": [...] }
         """
-        groups = defaultdict(list)
-        ip_counter = defaultdict(int)
+        whitelist_group = []
+        channels_by_ip: Dict[str, List[Channel]] = defaultdict(list)
         
-        # 白名单独立分组
-        whitelist_group = [ch for ch in channels if self._is_in_white_list(ch, white_list)]
+        # 单次遍历：白名单独立分组，其余按IP归类
+        for ch in channels:
+            if self._is_in_white_list(ch, white_list):
+                whitelist_group.append(ch)
+            else:
+                channels_by_ip[self._get_url_meta(ch.url)[0]].append(ch)
+        
+        groups: Dict[str, List[Channel]] = {}
         if whitelist_group:
             groups["whitelist"] = whitelist_group
         
-        # 常规分组
-        for ch in channels:
-            if self._is_in_white_list(ch, white_list):
-                continue
-                
-            ip = self._extract_ip_from_url(ch.url)
-            group_idx = ip_counter[ip] // self.max_channels_per_ip
-            group_key = f"{ip}_{group_idx}"
-            
-            groups[group_key].append(ch)
-            ip_counter[ip] += 1
-            
-            self.log.debug("IP %s 频道数超过 %d，创建分组 %s", 
-                         ip, self.max_channels_per_ip, group_key)
+        # 按单IP最大频道数切片分组
+        size = self.max_channels_per_ip
+        for ip, members in channels_by_ip.items():
+            for group_idx, start in enumerate(range(0, len(members), size)):
+                groups[f"{ip}_{group_idx}"] = members[start:start + size]
+            if len(members) > size:
+                self.log.debug("IP %s 频道数超过 %d，拆分为 %d 组",
+                             ip, size, group_idx + 1)
         
         return groups
 
@@ -255,14 +336,23 @@ class SpeedTester:
                 self.concurrency,
                 self.concurrency // (len(channels) // self.max_channels_per_ip + 1)
             ))
-            group_semaphore = asyncio.BoundedSemaphore(group_concurrency)
             
-            async def process_channel(channel):
-                async with group_semaphore:
+            # 首个频道单独测试，预热DNS缓存与keep-alive连接后再并发
+            await self._test_single_channel(
+                session, channels[0], progress_cb, failed_urls, white_list)
+            
+            # 固定数量的工作协程从共享迭代器取频道，任务数不随频道数增长
+            pending = islice(channels, 1, None)
+            
+            async def worker():
+                for channel in pending:
                     await self._test_single_channel(
                         session, channel, progress_cb, failed_urls, white_list)
             
-            await self._safe_gather([process_channel(ch) for ch in channels])
+            workers = {asyncio.ensure_future(worker())
+                       for _ in range(min(group_concurrency, len(channels) - 1))}
+            if workers:
+                await self._wait_tasks(workers)
             
             # 成功则重置失败计数
             if ip in self.failed_ips:
@@ -286,11 +376,18 @@ class SpeedTester:
                                  white_list: Set[str]) -> None:
         """测试单个频道"""
         if self._is_in_white_list(channel, white_list):
-            channel.status = 'online'
+            channel.status = STATUS_ONLINE
             self.log.debug("🟢 白名单跳过 %s", channel.name)
             progress_cb(1)
             return
 
+        cached = await self._get_verdict(channel.url)
+        if cached is not None:
+            self.log.debug("💾 命中缓存 %s", channel.name)
+            self._handle_success(channel, *cached)
+            progress_cb(1)
+            return
+
         async with self.semaphore:
             try:
                 self.log.debug("🔍 开始测试 %s", channel.name)
@@ -298,6 +395,7 @@ class SpeedTester:
                 success, speed, latency = await self._unified_test(session, channel)
                 
                 if success:
+                    await self._store_verdict(channel.url, (speed, latency))
                     self._handle_success(channel, speed, latency)
                 else:
                     self._handle_failure(channel, failed_urls, speed, latency)
@@ -307,13 +405,25 @@ class SpeedTester:
             finally:
                 progress_cb(1)
 
+    async def _get_verdict(self, url: str) -> Optional[Tuple[float, float]]:
+        """读取未过期的成功测速结果 (速度, 延迟)（磁盘I/O在线程中执行，不阻塞事件循环）"""
+        if self.verdict_cache is None:
+            return None
+        return await asyncio.to_thread(self.verdict_cache.get, url)
+
+    async def _store_verdict(self, url: str, verdict: Tuple[float, float]) -> None:
+        """写入成功测速结果（失败结果不缓存，偶发超时的频道下次运行会重新测试）"""
+        if self.verdict_cache is None:
+            return
+        await asyncio.to_thread(self.verdict_cache.set, url, verdict, expire=self.verdict_ttl)
+
     async def _unified_test(self,
                           session: aiohttp.ClientSession,
                           channel: Channel) -> Tuple[bool, float, float]:
         """统一测试方法（支持UDP/HTTP协议）"""
         try:
             headers = {'User-Agent': 'Mozilla/5.0'}
-            is_udp = self._is_udp_url(channel.url)
+            is_udp = self._get_url_meta(channel.url)[1]
             timeout_val = self.udp_timeout if is_udp else self.http_timeout
             timeout = aiohttp.ClientTimeout(total=timeout_val)
             
@@ -321,27 +431,38 @@ class SpeedTester:
             min_speed = self.min_udp_download_speed if is_udp else self.min_download_speed
             max_latency = self.max_udp_latency if is_udp else self.max_http_latency
 
-            # 阶段1：快速HEAD请求测延迟
-            latency_start = time.perf_counter()
-            async with session.head(channel.url, headers=headers, timeout=timeout) as resp:
-                latency = (time.perf_counter() - latency_start) * 1000
-                if latency > max_latency or resp.status != 200:
-                    return False, 0.0, latency
+            # udp:// 与 rtp:// 直接走数据报探测（HTTP代理的/rtp/、/udp/路径仍走HTTP）
+            if channel.url[:6].lower() in UDP_SCHEMES:
+                return await self._udp_probe(channel.url, min_speed, max_latency)
 
-            # 阶段2：GET请求测速度（复用连接）
-            start = time.perf_counter()
-            content_size = 0
-            
-            # 使用iter_chunked分块读取，避免一次性加载大文件
+            # 单次Range GET：首块到达时间即延迟，随后在同一响应上继续测速
+            headers['Range'] = f'bytes=0-{self.max_download_size - 1}'
+            start_ns = time.perf_counter_ns()
             async with session.get(channel.url, headers=headers, timeout=timeout) as resp:
-                async for chunk in resp.content.iter_chunked(1024 * 4):  # 4KB chunks
-                    content_size += len(chunk)
-                    # 达到最大下载量时提前结束
-                    if content_size >= self.max_download_size:
-                        break
-                
-                duration = time.perf_counter() - start
-                speed = content_size / duration / 1024 if duration > 0 else 0
+                first = await resp.content.readany()
+                latency = (time.perf_counter_ns() - start_ns) / 1e6
+                if latency > max_latency or resp.status not in (200, 206):
+                    return False, 0.0, latency
+
+                # 使用iter_chunked分块读取，避免一次性加载大文件
+                content_size = len(first)
+                if content_size < self.max_download_size:
+                    async for chunk in resp.content.iter_chunked(self.read_chunk_size):
+                        content_size += len(chunk)
+                        # 达到最大下载量时提前结束
+                        if content_size >= self.max_download_size:
+                            break
+                        # 速度已可明确判定时提前结束
+                        elapsed_ns = time.perf_counter_ns() - start_ns
+                        if elapsed_ns > EARLY_PASS_NS:
+                            current_speed = content_size * 1e9 / 1024 / elapsed_ns
+                            if current_speed >= min_speed * EARLY_PASS_RATIO:
+                                break
+                            if elapsed_ns > EARLY_FAIL_NS and current_speed < min_speed * EARLY_FAIL_RATIO:
+                                break
+
+                duration_ns = time.perf_counter_ns() - start_ns
+                speed = content_size * 1e9 / 1024 / duration_ns if duration_ns > 0 else 0
                 return speed >= min_speed, speed, latency
 
         except asyncio.TimeoutError:
@@ -352,22 +473,78 @@ class SpeedTester:
             self.log.error("测试错误 %s: %s", channel.url, str(e)[:100])
             return False, 0.0, 0.0
 
+    async def _udp_probe(self,
+                         url: str,
+                         min_speed: float,
+                         max_latency: float) -> Tuple[bool, float, float]:
+        """
+        UDP/RTP原生探测：仅支持IPv4组播地址（加入组后测首包延迟与接收速率）
+        单播地址与主机名没有可接收的推流，直接判定失败
+        """
+        try:
+            parsed = urlparse(url)
+            host, port = parsed.hostname, parsed.port
+            group = ipaddress.IPv4Address(host) if host else None
+        except ValueError:
+            return False, 0.0, 0.0
+        if not port or group is None or not group.is_multicast:
+            return False, 0.0, 0.0
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        transport = None
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # 只绑定组地址（不回退到通配地址），同端口的其他组探测不会串收数据
+            sock.bind((host, port))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                            group.packed + socket.inet_aton('0.0.0.0'))
+            sock.setblocking(False)
+
+            loop = asyncio.get_running_loop()
+            start_ns = time.perf_counter_ns()
+            transport, protocol = await loop.create_datagram_endpoint(
+                lambda: _DatagramCounter(self.max_download_size), sock=sock)
+
+            first_ns = await asyncio.wait_for(protocol.first_packet, self.udp_timeout)
+            latency = (first_ns - start_ns) / 1e6
+            if latency > max_latency:
+                return False, 0.0, latency
+
+            # 在剩余时间内接收数据，达到最大下载量即结束
+            remaining = self.udp_timeout - (time.perf_counter_ns() - start_ns) / 1e9
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(asyncio.shield(protocol.limit_reached), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            duration_ns = time.perf_counter_ns() - start_ns
+            speed = protocol.bytes_received * 1e9 / 1024 / duration_ns if duration_ns > 0 else 0
+            return speed >= min_speed, speed, latency
+        except (asyncio.TimeoutError, OSError, ValueError):
+            return False, 0.0, 0.0
+        finally:
+            if transport is not None:
+                transport.close()
+            else:
+                sock.close()
+
     def _handle_success(self,
                       channel: Channel,
                       speed: float,
                       latency: float) -> None:
         """处理成功结果"""
-        self.success_count += 1
-        channel.status = 'online'
+        channel.status = STATUS_ONLINE
         channel.response_time = latency
         channel.download_speed = speed
         
-        protocol = "UDP" if self._is_udp_url(channel.url) else "HTTP"
-        self.log.info(
-            "✅ 成功 | %-5s | %-5s | %6.1fKB/s | %4.0fms | %s",
-            protocol, channel.name[:30], speed, latency,
-            self._simplify_url(channel.url)
-        )
+        if self._log_enabled(logging.INFO):
+            protocol = "UDP" if self._get_url_meta(channel.url)[1] else "HTTP"
+            self.logger.info(
+                "✅ 成功 | %-5s | %-5s | %6.1fKB/s | %4.0fms | %s",
+                protocol, channel.name[:30], speed, latency,
+                self._simplify_url(channel.url)
+            )
 
     def _handle_failure(self,
                        channel: Channel,
@@ -376,11 +553,13 @@ class SpeedTester:
                        latency: float) -> None:
         """处理失败结果"""
         failed_urls.add(channel.url)
-        channel.status = 'offline'
-        ip = self._extract_ip_from_url(channel.url)
+        channel.status = STATUS_OFFLINE
+        ip, is_udp = self._get_url_meta(channel.url)
         self.failed_ips[ip] += 1
         
-        is_udp = self._is_udp_url(channel.url)
+        if not self._log_enabled(logging.WARNING):
+            return
+        
         reason = (
             "速度不足" if speed > 0 and speed < (
                 self.min_udp_download_speed if is_udp else self.min_download_speed
@@ -391,7 +570,7 @@ class SpeedTester:
             "连接失败"
         )
         
-        self.log.warning(
+        self.logger.warning(
             "❌ 失败 | %-5s | %-5s | %6.1fKB/s | %4.0fms | %-8s | %s",
             "UDP" if is_udp else "HTTP",
             channel.name[:30], speed, latency, reason,
@@ -404,21 +583,29 @@ class SpeedTester:
                      error: Exception) -> None:
         """处理异常"""
         failed_urls.add(channel.url)
-        channel.status = 'offline'
-        ip = self._extract_ip_from_url(channel.url)
+        channel.status = STATUS_OFFLINE
+        ip = self._get_url_meta(channel.url)[0]
         self.failed_ips[ip] += 1
         
-        self.log.error(
-            "‼️ 异常 | %-30s | %-20s | %s",
-            channel.name[:30], str(error)[:20],
-            self._simplify_url(channel.url)
-        )
+        if self._log_enabled(logging.ERROR):
+            self.logger.error(
+                "‼️ 异常 | %-30s | %-20s | %s",
+                channel.name[:30], str(error)[:20],
+                self._simplify_url(channel.url)
+            )
+
+    def _get_url_meta(self, url: str) -> Tuple[str, bool]:
+        """获取URL的(IP, 是否UDP)，每个URL只解析一次"""
+        meta = self._url_meta.get(url)
+        if meta is None:
+            meta = self._url_meta[url] = (self._extract_ip_from_url(url), self._is_udp_url(url))
+        return meta
 
     def _is_udp_url(self, url: str) -> bool:
         """判断是否为UDP协议URL"""
         url_lower = url.lower()
-        return (url_lower.startswith(('udp://', 'rtp://')) or 
-                bool(self.rtp_udp_pattern.search(url_lower)))
+        return (url_lower.startswith(UDP_SCHEMES) or
+                '/rtp/' in url_lower or '/udp/' in url_lower)
 
     def _extract_ip_from_url(self, url: str) -> str:
         """从URL提取IP地址"""
@@ -431,7 +618,8 @@ class SpeedTester:
         except:
             return "unknown"
 
-    def _simplify_url(self, url: str) -> str:
+    @staticmethod
+    def _simplify_url(url: str) -> str:
         """简化URL显示"""
         return url[:100] + '...' if len(url) > 100 else url
 
@@ -441,4 +629,4 @@ class SpeedTester:
         """检查是否在白名单中"""
         if not white_list:
             return False
-        return channel.name.lower() in white_list
\ No newline at end of file
+        return channel.get_name_lower() in white_list
\ No newline at end of file
@@ -1,66 +1,194 @@
 #!/usr/bin/env python3
+from __future__ import annotations
 import os
 import asyncio
 import configparser
 from pathlib import Path
-from typing import List, Set, Dict, Optional, Tuple, Callable
+from typing import List, Set, FrozenSet, Dict, Optional, Tuple, Callable, NamedTuple, TYPE_CHECKING
 import re
 import logging
+import logging.handlers
+import queue
 import gc
 import sys
+import json
+import hashlib
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
+from operator import attrgetter
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
 from core import (
-    SourceFetcher,
     PlaylistParser,
     AutoCategoryMatcher,
-    SpeedTester,
     ResultExporter,
     Channel
 )
 from core.progress import SmartProgress
+from core.models import UNCATEGORIZED, STATUS_ONLINE
+
+if TYPE_CHECKING:
+    # 获取与测速模块依赖aiohttp，只在对应阶段导入
+    from core import SourceFetcher, SpeedTester
+
+try:
+    import ahocorasick  # 依赖：pyahocorasick，用于黑名单的多模式匹配（缺失时回退为逐条子串检查）
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # 可选依赖：orjson，加速解析缓存的JSON读写
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # 可选依赖：uvloop，替换默认事件循环以降低大量并发测速的调度开销
+except ImportError:
+    uvloop = None
+
+# ==================== 启动页面模板 ====================
+START_PAGE_TITLE = r"""
+   ____   _   _   _       ___   _   _  __  __
+  / ___| | \ | | | |     |_ _| | | | | \ \/ /
+ | |     |  \| | | |      | |  | | | |  \  / 
+ | |___  | |\  | | |___   | |  | |_| |  /  \ 
+  \____| |_| \_| |_____| |___|  \___/  /_/\_\
+    """
+
+START_PAGE_TEMPLATE = """
+{title}
+╔══════════════════════════════════════════════════════╗
+║  IPTV智能处理系统 {version:<36}  ║
+║  启动时间: {start_time:<43}║
+╟──────────────────────────────────────────────────────╢
+║  处理流程:                                            ║
+║   1. 获取订阅源 → 2. 解析频道 → 3. 去重              ║
+║   4. 黑名单过滤 → 5. 智能分类 → 6. 测速测试          ║
+║   7. 结果导出 → 8. 完成!                             ║
+╟──────────────────────────────────────────────────────╢
+║  核心配置概览:                                        ║
+║  • 订阅源路径: {urls_path:<46}║
+║  • 分类模板: {templates_path:<48}║
+║  • 未分类频道路径: {uncategorized_path:<41}║
+║  • 黑名单路径: {blacklist_path:<45}║
+║  • 白名单路径: {whitelist_path:<45}║
+║  • 失败URL路径: {failed_urls_path:<43}║
+║  • 日志文件路径: {log_file_path:<42}║
+║  • 输出目录: {output_dir:<46}║
+║  • 抓取并发数: {fetcher_concurrency!s:<3} 超时: {fetcher_timeout!s:<4}秒          ║
+║  • 测速并发数: {tester_concurrency!s:<3} 超时: {tester_timeout!s:<4}秒          ║
+║  • 测速日志: {tester_logging:<45}║
+║  • 历史记录: {enable_history:<45}║
+║  • 日志级别: {log_level:<46}║
+╚══════════════════════════════════════════════════════╝
+"""
+
+LOG_FILE_BUFFER_SIZE = 1 << 16  # 日志文件写缓冲区大小（64KB）
+
+# ==================== 运行配置快照 ====================
+class PipelineSettings(NamedTuple):
+    """主流程使用的配置项（启动时一次性解析，各阶段直接读取属性）"""
+    urls_path: str
+    templates_path: str
+    output_dir: str
+    uncategorized_path: str
+    blacklist_path: str
+    whitelist_path: str
+    failed_urls_path: str
+    log_file_path: str
+    log_level: str
+    fetcher_timeout: float
+    fetcher_concurrency: int
+    parse_workers: int
+    enable_parse_cache: bool
+    parse_cache_path: str
+    tester_timeout: float
+    tester_concurrency: int
+    tester_max_attempts: int
+    tester_min_download_speed: float
+    tester_logging: bool
+    enable_history: bool
+
+def load_settings(config: configparser.ConfigParser) -> PipelineSettings:
+    """从ConfigParser解析主流程配置快照"""
+    return PipelineSettings(
+        urls_path=config.get('PATHS', 'urls_path', fallback='config/urls.txt'),
+        templates_path=config.get('PATHS', 'templates_path', fallback='config/templates.txt'),
+        output_dir=config.get('MAIN', 'output_dir', fallback='outputs'),
+        uncategorized_path=config.get('PATHS', 'uncategorized_channels_path', fallback='config/uncategorized.txt'),
+        blacklist_path=config.get('BLACKLIST', 'blacklist_path', fallback='config/blacklist.txt'),
+        whitelist_path=config.get('WHITELIST', 'whitelist_path', fallback='config/whitelist.txt'),
+        failed_urls_path=config.get('PATHS', 'failed_urls_path', fallback='config/failed_urls.txt'),
+        log_file_path=config.get('LOGGING', 'log_file_path', fallback='outputs/debug.log'),
+        log_level=config.get('LOGGING', 'log_level', fallback='INFO').upper(),
+        fetcher_timeout=config.getfloat('FETCHER', 'timeout', fallback=15),
+        fetcher_concurrency=config.getint('FETCHER', 'concurrency', fallback=5),
+        parse_workers=config.getint('PERFORMANCE', 'parse_workers', fallback=1) or os.cpu_count() or 1,
+        enable_parse_cache=config.getboolean('CACHE', 'enable_parse_cache', fallback=False),
+        parse_cache_path=config.get('PATHS', 'parse_cache_path', fallback='cache/parse_cache.json'),
+        tester_timeout=config.getfloat('TESTER', 'timeout', fallback=10),
+        tester_concurrency=config.getint('TESTER', 'concurrency', fallback=8),
+        tester_max_attempts=config.getint('TESTER', 'max_attempts', fallback=2),
+        tester_min_download_speed=config.getfloat('TESTER', 'min_download_speed', fallback=0.1),
+        tester_logging=config.getboolean('TESTER', 'enable_logging', fallback=False),
+        enable_history=config.getboolean('EXPORTER', 'enable_history', fallback=False)
+    )
 
 # ==================== 工具函数 ====================
-def load_list_file(path: str) -> Set[str]:
-    """加载名单文件（黑名单/白名单）"""
+def load_list_file(path: str) -> FrozenSet[str]:
+    """加载名单文件（黑名单/白名单，加载后只读，返回frozenset）"""
     file = Path(path)
     if not file.exists():
-        return set()
-    with open(file, 'r', encoding='utf-8') as f:
-        return {line.strip().lower() for line in f if line.strip() and not line.startswith('#')}
+        return frozenset()
+    # 整个文件一次读入并统一转小写，按行切分均在C层完成
+    text = file.read_text(encoding='utf-8').lower()
+    return frozenset(line for line in map(str.strip, text.splitlines()) if line and line[0] != '#')
 
 def load_urls(path: str) -> List[str]:
     """加载订阅源URL列表"""
     file = Path(path)
     if not file.exists():
         raise FileNotFoundError(f"订阅源文件不存在: {file}")
-    with open(file, 'r', encoding='utf-8') as f:
-        return [line.strip() for line in f if line.strip()]
-
-def is_blacklisted(channel: Channel, blacklist: Set[str]) -> bool:
-    """检查频道是否在黑名单中"""
-    channel_name = channel.name.lower()
-    channel_url = channel.url.lower()
-    return any(
-        entry in channel_name or entry in channel_url
-        for entry in blacklist
-        if entry.strip() and not entry.startswith('#')
-    )
+    return list(filter(None, map(str.strip, file.read_text(encoding='utf-8').splitlines())))
+
+def save_failed_urls(path: str, failed_urls: Set[str]) -> None:
+    """保存测速失败的URL（排序后拼接为单个字节缓冲区一次写入，内容不变时文件也不变）"""
+    file = Path(path)
+    file.parent.mkdir(parents=True, exist_ok=True)
+    buf = bytearray()
+    for url in sorted(failed_urls):
+        buf += url.encode('utf-8')
+        buf += b'\n'
+    file.write_bytes(buf)
+
+def compile_blacklist(blacklist: FrozenSet[str]) -> Callable[[str], bool]:
+    """
+    将黑名单编译为子串匹配函数（输入需为小写文本）
+    条目需已由load_list_file清理（去除空行与注释、统一小写）
+    已安装pyahocorasick时使用Aho-Corasick自动机单次线性扫描，否则在预先构建的元组上逐条子串检查
+    （数万条目的交替正则编译与匹配都明显慢于逐条子串检查，不作为回退方案）
+    """
+    if not blacklist:
+        return lambda text: False
+    if ahocorasick is None:
+        entries = tuple(blacklist)
+        return lambda text: any(entry in text for entry in entries)
+
+    automaton = ahocorasick.Automaton()
+    for entry in blacklist:
+        automaton.add_word(entry, entry)
+    automaton.make_automaton()
+    return lambda text: next(automaton.iter(text), None) is not None
+
+def is_blacklisted(channel: Channel, contains: Callable[[str], bool]) -> bool:
+    """检查频道是否在黑名单中（名称与URL以换行拼接，一次扫描完成）"""
+    return contains(f"{channel.name}\n{channel.url}".lower())
 
 async def fetch_sources(fetcher: SourceFetcher, urls: List[str], logger: logging.Logger) -> List[str]:
-    """获取订阅源内容（带重试）"""
-    contents = []
-    for attempt in range(1, 3):
-        try:
-            progress = SmartProgress(len(urls), f"获取订阅源(尝试{attempt}/2)")
-            contents = await fetcher.fetch_all(urls, progress.update)
-            progress.complete()
-            break
-        except Exception as e:
-            if attempt == 2:
-                raise
-            logger.warning(f"第{attempt}次获取失败: {str(e)}")
-            await asyncio.sleep(2 ** attempt)
+    """获取订阅源内容（重试在单个URL级别进行，失败的源返回空内容并被过滤）"""
+    progress = SmartProgress(len(urls), "获取订阅源")
+    contents = await fetcher.fetch_all(urls, progress.update)
+    progress.complete()
     return [c for c in contents if c and c.strip()]
 
 def parse_channels(parser: PlaylistParser, contents: List[str], logger: logging.Logger) -> List[Channel]:
@@ -72,10 +200,6 @@ def parse_channels(parser: PlaylistParser, contents: List[str], logger: logging.
         try:
             channels = list(parser.parse(content))
             all_channels.extend(channels)
-            
-            if len(all_channels) % 5000 == 0:
-                gc.collect()
-                
             progress.update()
         except Exception as e:
             logger.error(f"解析异常: {str(e)}")
@@ -84,96 +208,219 @@ def parse_channels(parser: PlaylistParser, contents: List[str], logger: logging.
     progress.complete()
     return all_channels
 
-def remove_duplicates(channels: List[Channel], logger: logging.Logger) -> List[Channel]:
-    """去重处理"""
-    progress = SmartProgress(len(channels), "去重进度")
-    unique_channels = {channel.url: channel for channel in channels}
-    progress.update(len(channels))
-    progress.complete()
-    return list(unique_channels.values())
+ChannelRow = Tuple[str, str, str]  # (名称, URL, 原始分类)
 
-def filter_blacklist(channels: List[Channel], blacklist: Set[str], logger: logging.Logger) -> List[Channel]:
-    """黑名单过滤"""
-    if not blacklist:
-        return channels
+def _channel_rows(parser: PlaylistParser, content: str) -> List[ChannelRow]:
+    """解析单个订阅源为元组列表（可跨进程传递、可直接写入JSON缓存）"""
+    return [(c.name, c.url, c.original_category) for c in parser.parse(content)]
+
+def _build_channels(results: List[Optional[List[ChannelRow]]]) -> List[Channel]:
+    """按订阅源顺序把元组结果还原为Channel对象（解析失败的源为None，直接跳过）"""
+    return [
+        Channel(name=name, url=url, original_category=category)
+        for name, url, category in chain.from_iterable(filter(None, results))
+    ]
+
+_worker_parser: Optional[PlaylistParser] = None
+
+def _init_parse_worker(config_dict: Dict[str, Dict[str, str]]) -> None:
+    """解析子进程初始化：每个进程只构建一次解析器"""
+    global _worker_parser
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_dict(config_dict)
+    _worker_parser = PlaylistParser(config)
+
+def _parse_worker(content: str) -> List[ChannelRow]:
+    """在子进程中解析单个订阅源，返回元组列表（比直接序列化Channel对象开销小得多）"""
+    return _channel_rows(_worker_parser, content)
+
+async def _parse_rows_parallel(config: configparser.ConfigParser, contents: List[str], workers: int,
+                               progress: SmartProgress, logger: logging.Logger) -> List[Optional[List[ChannelRow]]]:
+    """多进程解析，按输入顺序返回每个订阅源的元组列表（失败为None）"""
+    config_dict = {section: dict(config.items(section, raw=True)) for section in config.sections()}
+    loop = asyncio.get_running_loop()
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker,
+                             initargs=(config_dict,)) as pool:
+        async def parse_one(content: str) -> Optional[List[ChannelRow]]:
+            try:
+                return await loop.run_in_executor(pool, _parse_worker, content)
+            except Exception as e:
+                logger.error(f"解析异常: {str(e)}")
+                return None
+            finally:
+                progress.update()
         
-    progress = SmartProgress(len(channels), "过滤进度")
-    filtered = [c for c in channels if not is_blacklisted(c, blacklist)]
+        return await asyncio.gather(*(parse_one(content) for content in contents))
+
+async def parse_channels_parallel(config: configparser.ConfigParser, contents: List[str],
+                                  workers: int, logger: logging.Logger) -> List[Channel]:
+    """多进程并行解析所有频道（按订阅源分发，结果保持原始顺序）"""
+    progress = SmartProgress(len(contents), "解析进度")
+    results = await _parse_rows_parallel(config, contents, workers, progress, logger)
+    all_channels = _build_channels(results)
+    progress.complete()
+    return all_channels
+
+def load_parse_cache(path: str, logger: logging.Logger) -> Dict[str, List[ChannelRow]]:
+    """读取解析缓存（文件缺失或损坏时返回空缓存）"""
+    file = Path(path)
+    if not file.exists():
+        return {}
+    try:
+        data = file.read_bytes()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except (OSError, ValueError) as e:
+        logger.warning(f"解析缓存读取失败，将重新解析: {str(e)}")
+        return {}
+
+def save_parse_cache(path: str, cache: Dict[str, List[ChannelRow]], logger: logging.Logger) -> None:
+    """写入解析缓存（先写临时文件再替换，中途失败不会留下半个文件）"""
+    file = Path(path)
+    try:
+        file.parent.mkdir(parents=True, exist_ok=True)
+        if orjson is not None:
+            data = orjson.dumps(cache)
+        else:
+            data = json.dumps(cache, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        tmp = file.with_name(file.name + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, file)
+    except (OSError, TypeError) as e:
+        logger.warning(f"解析缓存写入失败: {str(e)}")
+
+def _parse_cache_hasher(parser: PlaylistParser):
+    """
+    缓存键的基础哈希器：预先混入程序版本与URL参数过滤规则
+    解析逻辑或过滤配置变化后旧缓存自动失效
+    """
+    from core import __version__
+    seed = f"{__version__}\n{','.join(sorted(parser.params_to_remove))}\n"
+    return hashlib.blake2b(seed.encode('utf-8'), digest_size=16)
+
+async def parse_channels_cached(config: configparser.ConfigParser, parser: PlaylistParser, contents: List[str],
+                                cache_path: str, workers: int, logger: logging.Logger) -> List[Channel]:
+    """
+    带缓存的解析：按订阅源内容哈希复用上次的解析结果，只解析内容有变化的订阅源
+    缓存只保留本次出现的订阅源，已下线的源自动淘汰
+    """
+    cache = load_parse_cache(cache_path, logger)
+    base = _parse_cache_hasher(parser)
+    digests = []
+    for content in contents:
+        hasher = base.copy()
+        hasher.update(content.encode('utf-8'))
+        digests.append(hasher.hexdigest())
+    
+    # 相同内容的订阅源只解析一次
+    misses = {digest: content for digest, content in zip(digests, contents) if digest not in cache}
+    logger.info(f"• 解析缓存: 命中 {sum(digest in cache for digest in digests)}/{len(contents)}")
+    
+    results: Dict[str, Optional[List[ChannelRow]]] = {}
+    if misses:
+        progress = SmartProgress(len(misses), "解析进度")
+        workers = min(workers, len(misses))
+        if workers > 1:
+            rows = await _parse_rows_parallel(config, list(misses.values()), workers, progress, logger)
+        else:
+            rows = []
+            for content in misses.values():
+                try:
+                    rows.append(_channel_rows(parser, content))
+                except Exception as e:
+                    logger.error(f"解析异常: {str(e)}")
+                    rows.append(None)
+                progress.update()
+        progress.complete()
+        results.update(zip(misses, rows))
+    
+    # 解析失败的源不写入缓存，下次运行重新解析
+    fresh = {}
+    for digest in dict.fromkeys(digests):
+        entry = results[digest] if digest in results else cache[digest]
+        if entry is not None:
+            fresh[digest] = entry
+    # 键集合不变（全部命中且没有淘汰）时缓存内容与文件一致，无需重写
+    if fresh.keys() != cache.keys():
+        save_parse_cache(cache_path, fresh, logger)
+    
+    return _build_channels([fresh.get(digest) for digest in digests])
+
+def dedup_and_filter(channels: List[Channel], blacklist: FrozenSet[str], logger: logging.Logger) -> Tuple[int, List[Channel]]:
+    """
+    去重与黑名单过滤（单次遍历完成）
+    返回: (去重后数量, 过滤后频道列表)
+    """
+    progress = SmartProgress(len(channels), "去重+过滤进度")
+    contains = compile_blacklist(blacklist)
+    seen: Set[str] = set()
+    add_seen = seen.add
+    filtered = []
+    append = filtered.append
+    for channel in channels:
+        url = channel.url
+        if url in seen:
+            continue
+        add_seen(url)
+        if not is_blacklisted(channel, contains):
+            append(channel)
     progress.update(len(channels))
     progress.complete()
-    return filtered
+    return len(seen), filtered
 
 def classify_channels(matcher: AutoCategoryMatcher, channels: List[Channel], logger: logging.Logger) -> List[Channel]:
     """智能分类"""
     progress = SmartProgress(len(channels), "分类进度")
     
-    # 批量匹配分类
-    category_mapping = matcher.batch_match([c.name for c in channels])
+    # 按不同名称批量计算分类与标准化结果，每个名称只计算一次
+    names = list(dict.fromkeys(c.name for c in channels))
+    # 没有分类规则时无需逐个匹配模板（名称标准化仍按后缀规则进行）
+    if matcher.has_templates:
+        category_mapping = matcher.batch_match(names)
+    else:
+        category_mapping = dict.fromkeys(names, UNCATEGORIZED)
+    name_mapping = matcher.batch_normalize(names)
+    normalize = matcher.normalize_channel_name
+    resolved = {}
+    for name in names:
+        normalized = name_mapping[name]
+        resolved[name] = (sys.intern(category_mapping[name]), normalized, normalize(normalized), normalized.lower())
     
-    # 应用分类结果
-    processed = []
+    # 应用分类结果：每个频道只做一次字典查找与属性赋值
     for channel in channels:
-        channel.category = category_mapping[channel.name]
-        channel.name = matcher.normalize_channel_name(channel.name)
-        processed.append(channel)
-        progress.update()
+        channel.category, channel.name, channel.normalized_name, channel.name_lower = resolved[channel.name]
+    progress.update(len(channels))
     
     progress.complete()
-    return processed
+    return channels
 
-async def test_channels(tester: SpeedTester, channels: List[Channel], whitelist: Set[str], logger: logging.Logger) -> Set[str]:
+async def test_channels(tester: SpeedTester, channels: List[Channel], whitelist: FrozenSet[str], logger: logging.Logger) -> Set[str]:
     """测速测试"""
     if not channels:
         logger.warning("⚠️ 无频道需要测速")
         return set()
 
     failed_urls = set()
-    batch_size = min(5000, len(channels))
     progress = SmartProgress(len(channels), "测速进度")
     
-    for i in range(0, len(channels), batch_size):
-        batch = channels[i:i+batch_size]
-        await tester.test_channels(batch, progress.update, failed_urls, whitelist)
-        gc.collect()
+    # 整个列表一次交给测速器，由其内部的滑动窗口与信号量控制并发，外层不再分批
+    try:
+        await tester.test_channels(channels, progress.update, failed_urls, whitelist)
+    finally:
+        await tester.aclose()
     
     progress.complete()
     return failed_urls
 
-async def export_results(exporter: ResultExporter, channels: List[Channel], whitelist: Set[str], logger: logging.Logger) -> None:
+async def export_results(exporter: ResultExporter, channels: List[Channel], whitelist: FrozenSet[str], logger: logging.Logger) -> None:
     """结果导出"""
     progress = SmartProgress(1, "导出进度")
     exporter.export(channels, whitelist, progress.update)  # 同步调用
     progress.complete()
 
 # ==================== 主流程 ====================
-def print_start_page(config: configparser.ConfigParser, logger: logging.Logger):
-    """打印优化后的启动页面"""
-    title = r"""
-   ____   _   _   _       ___   _   _  __  __
-  / ___| | \ | | | |     |_ _| | | | | \ \/ /
- | |     |  \| | | |      | |  | | | |  \  / 
- | |___  | |\  | | |___   | |  | |_| |  /  \ 
-  \____| |_| \_| |_____| |___|  \___/  /_/\_\
-    """
-    
-    # 获取关键配置
-    urls_path = config.get('PATHS', 'urls_path', fallback='config/urls.txt')
-    templates_path = config.get('PATHS', 'templates_path', fallback='config/templates.txt')
-    output_dir = config.get('MAIN', 'output_dir', fallback='outputs')
-    uncategorized_path = config.get('PATHS', 'uncategorized_channels_path', fallback='config/uncategorized.txt')
-    blacklist_path = config.get('BLACKLIST', 'blacklist_path', fallback='config/blacklist.txt')
-    whitelist_path = config.get('WHITELIST', 'whitelist_path', fallback='config/whitelist.txt')
-    failed_urls_path = config.get('PATHS', 'failed_urls_path', fallback='config/failed_urls.txt')
-    log_file_path = config.get('LOGGING', 'log_file_path', fallback='outputs/debug.log')
-    
-    fetcher_timeout = config.getfloat('FETCHER', 'timeout', fallback=15)
-    fetcher_concurrency = config.getint('FETCHER', 'concurrency', fallback=5)
-    tester_timeout = config.getfloat('TESTER', 'timeout', fallback=10)
-    tester_concurrency = config.getint('TESTER', 'concurrency', fallback=8)
-    tester_logging = config.getboolean('TESTER', 'enable_logging', fallback=False)  # 新增测速日志开关
-    enable_history = config.getboolean('EXPORTER', 'enable_history', fallback=False)
-    log_level = config.get('LOGGING', 'log_level', fallback='INFO').upper()
-    
+def print_start_page(settings: PipelineSettings, logger: logging.Logger):
+    """打印优化后的启动页面（静态部分见 START_PAGE_TEMPLATE，仅填充动态字段）"""
     # 获取版本信息
     try:
         from core import __version__
@@ -181,63 +428,102 @@ def print_start_page(config: configparser.ConfigParser, logger: logging.Logger):
     except ImportError:
         version = "v1.0.0"
     
-    # 优化后的启动信息
-    start_info = f"""
-{title}
-╔══════════════════════════════════════════════════════╗
-║  IPTV智能处理系统 {version.ljust(36)}  ║
-║  启动时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S').ljust(43)}║
-╟──────────────────────────────────────────────────────╢
-║  处理流程:                                            ║
-║   1. 获取订阅源 → 2. 解析频道 → 3. 去重              ║
-║   4. 黑名单过滤 → 5. 智能分类 → 6. 测速测试          ║
-║   7. 结果导出 → 8. 完成!                             ║
-╟──────────────────────────────────────────────────────╢
-║  核心配置概览:                                        ║
-║  • 订阅源路径: {urls_path.ljust(46)}║
-║  • 分类模板: {templates_path.ljust(48)}║
-║  • 未分类频道路径: {uncategorized_path.ljust(41)}║
-║  • 黑名单路径: {blacklist_path.ljust(45)}║
-║  • 白名单路径: {whitelist_path.ljust(45)}║
-║  • 失败URL路径: {failed_urls_path.ljust(43)}║
-║  • 日志文件路径: {log_file_path.ljust(42)}║
-║  • 输出目录: {output_dir.ljust(46)}║
-║  • 抓取并发数: {str(fetcher_concurrency).ljust(3)} 超时: {str(fetcher_timeout).ljust(4)}秒          ║
-║  • 测速并发数: {str(tester_concurrency).ljust(3)} 超时: {str(tester_timeout).ljust(4)}秒          ║
-║  • 测速日志: {'启用' if tester_logging else '禁用'.ljust(45)}║
-║  • 历史记录: {'启用' if enable_history else '禁用'.ljust(45)}║
-║  • 日志级别: {log_level.ljust(46)}║
-╚══════════════════════════════════════════════════════╝
-"""
-    logger.info(start_info)
+    logger.info(START_PAGE_TEMPLATE.format(
+        title=START_PAGE_TITLE,
+        version=version,
+        start_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        urls_path=settings.urls_path,
+        templates_path=settings.templates_path,
+        output_dir=settings.output_dir,
+        uncategorized_path=settings.uncategorized_path,
+        blacklist_path=settings.blacklist_path,
+        whitelist_path=settings.whitelist_path,
+        failed_urls_path=settings.failed_urls_path,
+        log_file_path=settings.log_file_path,
+        fetcher_timeout=settings.fetcher_timeout,
+        fetcher_concurrency=settings.fetcher_concurrency,
+        tester_timeout=settings.tester_timeout,
+        tester_concurrency=settings.tester_concurrency,
+        tester_logging='启用' if settings.tester_logging else '禁用',
+        enable_history='启用' if settings.enable_history else '禁用',
+        log_level=settings.log_level
+    ))
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    大缓冲区文件日志处理器
+    WARNING以下的记录只写入缓冲区（写满时自动落盘），WARNING及以上级别立即落盘；
+    显式flush()与关闭时照常写出缓冲区
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._defer_flush = False
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_FILE_BUFFER_SIZE,
+                    encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        # StreamHandler.emit每条记录后都会调用flush，低级别记录跳过这次逐条落盘
+        self._defer_flush = record.levelno < logging.WARNING
+        try:
+            super().emit(record)
+        finally:
+            self._defer_flush = False
+
+    def flush(self):
+        if not self._defer_flush:
+            super().flush()
+
+_log_listener: Optional[logging.handlers.QueueListener] = None
 
 def setup_logging(config: configparser.ConfigParser) -> logging.Logger:
-    """配置日志系统"""
+    """配置日志系统（记录经队列交给后台线程输出，业务代码不阻塞在I/O上）"""
+    global _log_listener
+    stop_logging()
+
     logger = logging.getLogger()
     logger.setLevel(config.get('LOGGING', 'log_level', fallback='INFO').upper())
 
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+        handler.close()
+
+    handlers = []
 
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     ))
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
 
     if config.getboolean('LOGGING', 'log_to_file', fallback=False):
         log_file = Path(config.get('LOGGING', 'log_file_path', fallback='outputs/debug.log'))
         log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+        file_handler = BufferedFileHandler(log_file, mode='w', encoding='utf-8')
         file_handler.setFormatter(logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         ))
-        logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
     return logger
 
+def stop_logging() -> None:
+    """停止日志后台线程并输出队列中剩余的记录"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
 async def main():
     """主工作流程（完整修复版）"""
     try:
@@ -246,23 +532,28 @@ async def main():
         config = configparser.ConfigParser()
         config.read('config/config.ini', encoding='utf-8')
         logger = setup_logging(config)
+        settings = load_settings(config)
         logger.info("✅ 配置加载完成")
-        print_start_page(config, logger)
+        print_start_page(settings, logger)
 
         # ==================== 数据准备阶段 ====================
         logger.info("\n🔹🔹 阶段1/7：数据准备")
-        blacklist = load_list_file(config.get('BLACKLIST', 'blacklist_path', fallback='config/blacklist.txt'))
-        whitelist = load_list_file(config.get('WHITELIST', 'whitelist_path', fallback='config/whitelist.txt'))
-        urls = load_urls(config.get('PATHS', 'urls_path', fallback='config/urls.txt'))
+        # 名单与订阅源文件在线程池中并行读取，不阻塞事件循环
+        blacklist, whitelist, urls = await asyncio.gather(
+            asyncio.to_thread(load_list_file, settings.blacklist_path),
+            asyncio.to_thread(load_list_file, settings.whitelist_path),
+            asyncio.to_thread(load_urls, settings.urls_path)
+        )
         logger.info(f"• 加载黑名单: {len(blacklist)}条")
         logger.info(f"• 加载白名单: {len(whitelist)}条")
         logger.info(f"• 加载订阅源: {len(urls)}个")
 
         # ==================== 订阅源获取阶段 ====================
         logger.info("\n🔹🔹 阶段2/7：获取订阅源")
+        from core import SourceFetcher
         fetcher = SourceFetcher(
-            timeout=config.getfloat('FETCHER', 'timeout', fallback=15),
-            concurrency=config.getint('FETCHER', 'concurrency', fallback=5),
+            timeout=settings.fetcher_timeout,
+            concurrency=settings.fetcher_concurrency,
             config=config
         )
         contents = await fetch_sources(fetcher, urls, logger)
@@ -271,57 +562,84 @@ async def main():
         # ==================== 频道解析阶段 ====================
         logger.info("\n🔹🔹 阶段3/7：解析频道")
         parser = PlaylistParser(config)
-        all_channels = parse_channels(parser, contents, logger)
-        unique_sources = len({c.url for c in all_channels})
-        logger.info(f"✅ 解析完成 | 总频道: {len(all_channels)} | 唯一源: {unique_sources}")
-
-        # ==================== 数据处理阶段 ====================
-        logger.info("\n🔹🔹 阶段4/7：数据处理")
-        unique_channels = remove_duplicates(all_channels, logger)
-        filtered_channels = filter_blacklist(unique_channels, blacklist, logger)
-        logger.info(f"✔ 处理完成 | 去重后: {len(unique_channels)} | 过滤后: {len(filtered_channels)}")
-
-        # ==================== 智能分类阶段 ====================
-        logger.info("\n🔹🔹 阶段5/7：智能分类")
-        matcher = AutoCategoryMatcher(
-            config.get('PATHS', 'templates_path', fallback='config/templates.txt'),
-            config
-        )
-        processed_channels = classify_channels(matcher, filtered_channels, logger)
-        classified = sum(1 for c in processed_channels if c.category != "未分类")
-        logger.info(f"✅ 分类完成 | 已分类: {classified} | 未分类: {len(processed_channels)-classified}")
+        gc.disable()  # 解析到分类阶段只批量创建无循环引用的对象，暂停分代GC避免反复全量扫描
+        try:
+            parse_workers = min(settings.parse_workers, len(contents))
+            if settings.enable_parse_cache:
+                all_channels = await parse_channels_cached(
+                    config, parser, contents, settings.parse_cache_path, parse_workers, logger)
+            elif parse_workers > 1:
+                all_channels = await parse_channels_parallel(config, contents, parse_workers, logger)
+            else:
+                all_channels = parse_channels(parser, contents, logger)
+            del contents  # 原始订阅源文本已无用，及时释放
+            unique_sources = len({c.url for c in all_channels})
+            logger.info(f"✅ 解析完成 | 总频道: {len(all_channels)} | 唯一源: {unique_sources}")
+
+            # ==================== 数据处理阶段 ====================
+            logger.info("\n🔹🔹 阶段4/7：数据处理")
+            unique_count, filtered_channels = dedup_and_filter(all_channels, blacklist, logger)
+            del all_channels  # 后续阶段只使用过滤结果，释放完整解析列表以降低峰值内存
+            logger.info(f"✔ 处理完成 | 去重后: {unique_count} | 过滤后: {len(filtered_channels)}")
+
+            # ==================== 智能分类阶段 ====================
+            logger.info("\n🔹🔹 阶段5/7：智能分类")
+            matcher = AutoCategoryMatcher(
+                settings.templates_path,
+                config
+            )
+            processed_channels = classify_channels(matcher, filtered_channels, logger)
+            del filtered_channels
+        finally:
+            gc.enable()  # 中途出错也要恢复GC，避免进程在关闭GC的状态下继续运行
+        gc.collect()
+        gc.freeze()  # 名单、配置与频道列表会存活到结束，移入永久代，测速阶段的GC不再扫描它们
+        uncategorized_count = Counter(map(attrgetter('category'), processed_channels))[UNCATEGORIZED]
+        logger.info(f"✅ 分类完成 | 已分类: {len(processed_channels)-uncategorized_count} | 未分类: {uncategorized_count}")
 
         # ==================== 测速测试阶段 ====================
         logger.info("\n🔹🔹 阶段6/7：测速测试")
+        from core import SpeedTester
         tester = SpeedTester(
-            timeout=config.getfloat('TESTER', 'timeout', fallback=10),
-            concurrency=config.getint('TESTER', 'concurrency', fallback=8),
-            max_attempts=config.getint('TESTER', 'max_attempts', fallback=2),
-            min_download_speed=config.getfloat('TESTER', 'min_download_speed', fallback=0.1),
-            enable_logging=config.getboolean('TESTER', 'enable_logging', fallback=False),  # 关键修复点
+            timeout=settings.tester_timeout,
+            concurrency=settings.tester_concurrency,
+            max_attempts=settings.tester_max_attempts,
+            min_download_speed=settings.tester_min_download_speed,
+            enable_logging=settings.tester_logging,  # 关键修复点
             config=config
         )
         sorted_channels = matcher.sort_channels_by_template(processed_channels, whitelist)
         failed_urls = await test_channels(tester, sorted_channels, whitelist, logger)
-        online_count = sum(1 for c in sorted_channels if c.status == 'online')
+        online_count = Counter(map(attrgetter('status'), sorted_channels))[STATUS_ONLINE]
         logger.info(f"✅ 测速完成 | 在线: {online_count}/{len(sorted_channels)} | 失败: {len(failed_urls)}")
+        # 失败URL在线程池中写入（run_in_executor立即提交到线程），与导出阶段并行
+        save_failed_future = asyncio.get_running_loop().run_in_executor(
+            None,
+            save_failed_urls,
+            settings.failed_urls_path,
+            failed_urls
+        )
 
         # ==================== 结果导出阶段 ====================
-        logger.info("\n🔹🔹 阶段7/7：结果导出")
-        exporter = ResultExporter(
-            output_dir=config.get('MAIN', 'output_dir', fallback='outputs'),
-            template_path=config.get('PATHS', 'templates_path'),
-            config=config,
-            matcher=matcher
-        )
-        await export_results(exporter, sorted_channels, whitelist, logger)
+        try:
+            logger.info("\n🔹🔹 阶段7/7：结果导出")
+            exporter = ResultExporter(
+                output_dir=settings.output_dir,
+                template_path=settings.templates_path,
+                config=config,
+                matcher=matcher
+            )
+            await export_results(exporter, sorted_channels, whitelist, logger)
+        finally:
+            # 导出失败时也要等待写入完成，失败URL不丢失
+            await save_failed_future
 
         # ==================== 最终统计 ====================
         logger.info("\n" + "="*60)
         logger.info("📊 最终统计")
         logger.info(f"• 总处理频道: {len(sorted_channels)}")
         logger.info(f"• 在线频道: {online_count} (成功率: {online_count/len(sorted_channels)*100:.1f}%)")
-        logger.info(f"• 未分类频道: {len(processed_channels)-classified}")
+        logger.info(f"• 未分类频道: {uncategorized_count}")
         logger.info("="*60 + "\n🎉 任务完成！")
 
     except KeyboardInterrupt:
@@ -351,8 +669,14 @@ if __name__ == "__main__":
         # 重新配置日志
         logger = setup_logging(config)
         
+        # 可选：使用uvloop事件循环
+        if uvloop is not None and config.getboolean('PERFORMANCE', 'use_uvloop', fallback=True):
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        
         # 运行主程序
         asyncio.run(main())
     except Exception as e:
         temp_logger.error(f"启动失败: {str(e)}", exc_info=True)
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+    finally:
+        stop_logging()
\ No newline at end of file